@@ -0,0 +1,229 @@
+"""
+Cached alarm playback.
+
+WAV files are decoded once into PCM buffers and kept in memory. A single
+persistent worker thread hands buffers to an audio sink, so raising an
+alarm costs a queue put instead of a thread spawn, a file open and a
+decode. Sinks that play asynchronously (simpleaudio, aplay) let alarms
+overlap.
+
+simpleaudio is optional (pip install simpleaudio); without it we fall back
+to piping PCM into `aplay`, and finally to the terminal bell.
+"""
+
+import collections
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    import simpleaudio
+except ImportError:
+    simpleaudio = None
+
+# --- Configuration ---
+# Relative sound names are looked up next to this file, not in the CWD.
+SOUNDS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class PcmBuffer:
+    """Decoded audio ready to hand to a sink."""
+    __slots__ = ("path", "frames", "channels", "sample_width", "rate")
+
+    def __init__(self, path, frames, channels, sample_width, rate):
+        self.path = path
+        self.frames = frames
+        self.channels = channels
+        self.sample_width = sample_width
+        self.rate = rate
+
+    @property
+    def duration(self):
+        return len(self.frames) / float(self.channels * self.sample_width * self.rate)
+
+
+def resolve_sound(name):
+    """Returns an absolute path for a sound file name."""
+    if os.path.isabs(name):
+        return name
+    return os.path.join(SOUNDS_DIR, name)
+
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def read_wav(path):
+    """
+    Reads a PCM WAV file into a PcmBuffer.
+
+    The stdlib wave module rejects WAVE_FORMAT_EXTENSIBLE headers (which
+    alarm-rooster.wav uses), so the RIFF chunks are walked by hand.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError(f"{path} is not a WAV file")
+
+    fmt = frames = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id, size = struct.unpack_from("<4sI", data, pos)
+        body = data[pos + 8:pos + 8 + size]
+        if chunk_id == b"fmt ":
+            fmt = body
+        elif chunk_id == b"data":
+            frames = body
+        pos += 8 + size + (size & 1)  # chunks are padded to even sizes
+
+    if fmt is None or frames is None:
+        raise ValueError(f"{path} is missing its fmt or data chunk")
+
+    tag, channels, rate, _, _, bits = struct.unpack_from("<HHIIHH", fmt)
+    if tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+        # The real format code is the first two bytes of the SubFormat GUID
+        tag = struct.unpack_from("<H", fmt, 24)[0]
+    if tag != WAVE_FORMAT_PCM:
+        raise ValueError(f"{path} is not PCM audio (format {tag:#x})")
+
+    return PcmBuffer(path, frames, channels, bits // 8, rate)
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_wav(name):
+    """Decodes a WAV file once and returns the cached PcmBuffer."""
+    path = resolve_sound(name)
+    with _cache_lock:
+        buffer = _cache.get(path)
+        if buffer is None:
+            buffer = _cache[path] = read_wav(path)
+        return buffer
+
+
+# --- Sinks ---
+
+class NullSink:
+    """Plays nothing; remembers what it was asked to play. Used for tests."""
+
+    def __init__(self):
+        self.played = []
+
+    def play(self, buffer):
+        self.played.append(buffer.path)
+
+
+class BellSink:
+    """Last resort: rings the terminal bell."""
+
+    def play(self, buffer):
+        sys.stdout.write("\a")
+        sys.stdout.flush()
+
+
+class SimpleAudioSink:
+    """Plays through simpleaudio; each call returns immediately and may overlap."""
+
+    def play(self, buffer):
+        simpleaudio.play_buffer(buffer.frames, buffer.channels, buffer.sample_width, buffer.rate)
+
+
+class AplaySink:
+    """Streams PCM into `aplay`. Overlapping alarms get their own aplay process."""
+
+    FORMATS = {1: "U8", 2: "S16_LE", 3: "S24_3LE", 4: "S32_LE"}
+
+    def play(self, buffer):
+        proc = subprocess.Popen(
+            ["aplay", "-q", "-t", "raw",
+             "-f", self.FORMATS[buffer.sample_width],
+             "-c", str(buffer.channels),
+             "-r", str(buffer.rate)],
+            stdin=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        # aplay reads at playback speed; feed it off the worker thread so the
+        # next alarm isn't held up behind this one.
+        threading.Thread(target=proc.communicate, args=(buffer.frames,), daemon=True).start()
+
+
+def default_sink():
+    """Picks the best sink available on this machine."""
+    if simpleaudio is not None:
+        return SimpleAudioSink()
+    if shutil.which("aplay"):
+        return AplaySink()
+    return BellSink()
+
+
+# --- Player ---
+
+class AlarmPlayer:
+    """Owns the playback worker and records alarm-to-sound latency."""
+
+    def __init__(self, sink=None, history=1000):
+        self.sink = sink if sink is not None else default_sink()
+        self.latencies = collections.deque(maxlen=history)  # seconds
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="alarm-audio", daemon=True)
+        self._worker.start()
+
+    def preload(self, *names):
+        """Decodes sounds on the worker so the first alarm doesn't pay for it."""
+        for name in names:
+            self._queue.put(("load", name, None))
+
+    def play(self, name):
+        """Queues a sound for playback and returns immediately."""
+        self._queue.put(("play", name, time.perf_counter()))
+
+    def wait_idle(self):
+        """Blocks until every queued request has been handed to the sink."""
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(None)
+        self._worker.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                action, name, requested = item
+                try:
+                    buffer = load_wav(name)
+                except (OSError, ValueError, struct.error) as e:
+                    print(f"Warning: Could not load alarm sound '{name}': {e}")
+                    if action == "play":
+                        BellSink().play(None)
+                    continue
+                if action == "play":
+                    try:
+                        self.sink.play(buffer)
+                    except Exception as e:
+                        print(f"Error playing sound: {e}")
+                        continue
+                    self.latencies.append(time.perf_counter() - requested)
+            finally:
+                self._queue.task_done()
+
+
+_default_player = None
+
+
+def default_player():
+    """Returns the process-wide AlarmPlayer, starting it on first use."""
+    global _default_player
+    if _default_player is None:
+        _default_player = AlarmPlayer()
+    return _default_player
@@ -4,20 +4,18 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
 import os
 import re
+from array import array
+
+import profiling
+import storage
+import tk_instrument
+from compact import LineStore
+from filewatch import FileTail, Watch
 
 folder_location = "/home/clawber/projects/py-assist/output/"
 
-filenames_dict = {
-    'u': 'urgent', 
-    'd': 'do', 
-    'l': 'lessons', 
-    'c': 'create', 
-    'e': 'experiences', 
-    'b': 'bored', 
-    'w': 'wins',
-    'x': 'deleted',
-    'q': 'questions'
-}
+# Key -> category; other keys sort into 'braindump-<KEY>'
+filenames_dict = storage.CATEGORIES
 
 
 class LineSorterGUI:
@@ -27,10 +25,18 @@ class LineSorterGUI:
         self.root.geometry("800x600")
         
         # Initialize variables
-        self.lines = []
+        self.lines = LineStore()
+        self.entry_ids = array('q')  # storage ids of self.lines when showing the braindump
         self.current_line = 0
         self.current_file = None
         self.modified = False
+
+        # Live updates: new braindump entries or lines appended to the open file
+        self.watch = None
+        self.tail = None            # FileTail of current_file
+        self.last_entry_id = 0      # newest braindump entry shown
+        self.data_version = None
+        self.sorted_since_save = [] # lines sorted out of current_file, not saved yet
         
         # Create menu
         self.create_menu()
@@ -70,6 +76,8 @@ class LineSorterGUI:
         
         # Configure text tags for highlighting
         self.text_area.tag_config("highlight", background="yellow", foreground="black")
+
+        self.open_braindump()
         
     def create_menu(self):
         menubar = tk.Menu(self.root)
@@ -77,18 +85,42 @@ class LineSorterGUI:
         
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
+        file_menu.add_command(label="Open Braindump", command=self.open_braindump, accelerator="Ctrl+B")
         file_menu.add_command(label="Open", command=self.open_file, accelerator="Ctrl+O")
         file_menu.add_command(label="Save", command=self.save_file, accelerator="Ctrl+S")
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.on_exit)
         
         # Bind keyboard shortcuts
+        self.root.bind('<Control-b>', lambda e: self.open_braindump())
         self.root.bind('<Control-o>', lambda e: self.open_file())
         self.root.bind('<Control-s>', lambda e: self.save_file())
         
         # Handle window close event
         self.root.protocol("WM_DELETE_WINDOW", self.on_exit)
         
+    @profiling.profiled('open_braindump')
+    def open_braindump(self):
+        if self.modified and self.current_file:
+            self.save_file()
+        try:
+            self.entry_ids, self.lines = storage.load_lines(storage.BRAINDUMP)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not read the braindump: {str(e)}")
+            return
+        self.current_file = None
+        self.current_line = 0
+        self.modified = False
+        self.tail = None
+        self.last_entry_id = max(self.entry_ids, default=0)
+        self.data_version = storage.data_version()
+        self.watch_source(storage.DB_FILE, names=(
+            os.path.basename(storage.DB_FILE), os.path.basename(storage.DB_FILE) + '-wal'))
+
+        self.file_label.config(text=f"Braindump ({len(self.lines)} lines)")
+        self.display_content()
+        self.update_status(f"Loaded {len(self.lines)} lines from the braindump")
+
     def open_file(self):
         file_path = filedialog.askopenfilename(
             title="Select a text file",
@@ -97,40 +129,134 @@ class LineSorterGUI:
         
         if file_path:
             try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
-                    self.lines = content.splitlines()
-                    self.current_file = file_path
-                    self.current_line = 0
-                    self.modified = False
-                    
-                    # Update file label
-                    filename = os.path.basename(file_path)
-                    self.file_label.config(text=f"File: {filename} ({len(self.lines)} lines)")
-                    
-                    # Display content
-                    self.display_content()
-                    self.update_status(f"Loaded {len(self.lines)} lines from {filename}")
+                if self.modified and self.current_file:
+                    self.save_file()
+                tail = FileTail(file_path)
+                with profiling.operation('read file'):
+                    self.lines = LineStore(tail.read_all())
+                self.tail = tail
+                self.entry_ids = array('q')
+                self.current_file = file_path
+                self.current_line = 0
+                self.modified = False
+                self.sorted_since_save = []
+                self.watch_source(file_path)
+                
+                # Update file label
+                filename = os.path.basename(file_path)
+                self.file_label.config(text=f"File: {filename} ({len(self.lines)} lines)")
+                
+                # Display content
+                self.display_content()
+                self.update_status(f"Loaded {len(self.lines)} lines from {filename}")
+                profiling.snapshot(f"opened {filename}")
                     
             except Exception as e:
                 messagebox.showerror("Error", f"Could not open file: {str(e)}")
     
+    @profiling.profiled('save_file')
     def save_file(self):
         if not self.current_file:
             return
             
         try:
-            with open(self.current_file, 'w', encoding='utf-8') as file:
-                if self.lines:
-                    file.write('\n'.join(self.lines) + '\n')
-                # If no lines left, create empty file
+            tmp_file = self.current_file + '.tmp'
+            for _ in range(3):
+                # Pick up anything appended since the last read so it isn't lost
+                self.sync_file()
+                data = ('\n'.join(self.lines) + '\n').encode('utf-8') if self.lines else b''
+                # An unterminated line still being written stays at the end
+                data += self.tail.partial
+                with open(tmp_file, 'wb') as file:
+                    file.write(data)
+                # Only replace the file if nothing was appended meanwhile
+                try:
+                    st = os.stat(self.current_file)
+                except FileNotFoundError:
+                    break
+                if st.st_ino == self.tail.inode and st.st_size == self.tail.offset:
+                    break
+            else:
+                os.remove(tmp_file)
+                self.update_status("File keeps changing on disk; not saved, try again")
+                return
+            os.replace(tmp_file, self.current_file)
+            self.tail.mark_written(data)
             
             self.modified = False
+            self.sorted_since_save = []
             self.update_status("File saved successfully")
             
         except Exception as e:
             messagebox.showerror("Error", f"Could not save file: {str(e)}")
+
+    # --- Live updates ---
+
+    def watch_source(self, path, names=None):
+        if self.watch:
+            self.watch.close()
+        self.watch = Watch(self.root, path, self.on_source_changed, names=names)
+
+    def on_source_changed(self):
+        try:
+            if self.current_file:
+                self.sync_file()
+            else:
+                self.sync_braindump()
+        except Exception as e:
+            self.update_status(f"Could not read new lines: {e}")
+
+    def sync_braindump(self):
+        """Adds braindump entries other tools stored since we last looked."""
+        version = storage.data_version()
+        if version == self.data_version:
+            return
+        self.data_version = version
+        new = storage.entries_after(storage.BRAINDUMP, self.last_entry_id)
+        if not new:
+            return
+        self.last_entry_id = max(self.last_entry_id, max(entry.id for entry in new))
+        # Newest entries go on top; keep the highlight on the same line
+        self.lines[0:0] = [entry.text for entry in new]
+        self.entry_ids[0:0] = array('q', [entry.id for entry in new])
+        if len(self.lines) > len(new):
+            self.current_line += len(new)
+        # Every line number below shifts, so this one is a full redraw
+        self.display_content()
+        self.file_label.config(text=f"Braindump ({len(self.lines)} lines)")
+        self.update_status(f"{len(new)} new braindump entries")
+
+    def sync_file(self):
+        """Merges lines appended to current_file, or re-syncs if it was rewritten."""
+        reset, lines = self.tail.read_new()
+        if reset:
+            # Someone else rewrote the file: take their version, minus lines
+            # we already sorted into categories
+            for line in self.sorted_since_save:
+                if line in lines:
+                    lines.remove(line)
+            self.lines = LineStore(lines)
+            self.current_line = min(self.current_line, max(len(lines) - 1, 0))
+            self.display_content()
+            self.update_status("File changed on disk; reloaded")
+        elif lines:
+            was_empty = not self.lines
+            start = len(self.lines)
+            self.lines.extend(lines)
+            if was_empty:
+                self.display_content()
+            else:
+                # Appended lines keep every existing line number, so just add them
+                self.text_area.insert(tk.END, ''.join(
+                    f"{start + i + 1:4d}: {line}\n" for i, line in enumerate(lines)))
+            self.update_status(f"{len(lines)} new line(s) appended")
+        else:
+            return
+        filename = os.path.basename(self.current_file)
+        marker = " *" if self.modified else ""
+        self.file_label.config(text=f"File: {filename} ({len(self.lines)} lines){marker}")
     
+    @profiling.profiled('display_content')
     def display_content(self):
         if not self.lines:
             self.text_area.delete(1.0, tk.END)
@@ -185,6 +311,7 @@ class LineSorterGUI:
         elif len(key) == 1 and key.isalpha():
             self.sort_line_to_file(key.lower())
     
+    @profiling.profiled('sort_line_to_file')
     def sort_line_to_file(self, letter):
         if not self.lines or self.current_line >= len(self.lines):
             return
@@ -192,20 +319,25 @@ class LineSorterGUI:
         # Get the line to move
         line_to_move = self.lines[self.current_line]
         
-        # Create filename
+        # Pick the category
         if letter in filenames_dict:
-            filename = f"{filenames_dict[letter]}.txt"
+            category = filenames_dict[letter]
         else:
-            filename = f"braindump-{letter.upper()}.txt"    
+            category = f"braindump-{letter.upper()}"
         
         try:
-            # Append line to the target file
-            with open(filename, 'a', encoding='utf-8') as file:
-                file.write(line_to_move + '\n')
+            if self.entry_ids:
+                # A braindump entry just changes category; nothing left to save.
+                # Only forget its id once the move succeeded.
+                storage.move_entry(self.entry_ids[self.current_line], storage.SORTED, category)
+                self.entry_ids.pop(self.current_line)
+            else:
+                storage.add_entry(storage.SORTED, line_to_move, category)
+                self.sorted_since_save.append(line_to_move)
+                self.modified = True
             
             # Remove line from current content
             self.lines.pop(self.current_line)
-            self.modified = True
             
             # Adjust current line position
             if self.current_line >= len(self.lines) and self.lines:
@@ -220,11 +352,13 @@ class LineSorterGUI:
             if self.current_file:
                 filename_display = os.path.basename(self.current_file)
                 self.file_label.config(text=f"File: {filename_display} ({len(self.lines)} lines) *")
+            else:
+                self.file_label.config(text=f"Braindump ({len(self.lines)} lines)")
             
-            self.update_status(f"Line moved to {filename}. {len(self.lines)} lines remaining.")
+            self.update_status(f"Line moved to {category}. {len(self.lines)} lines remaining.")
             
         except Exception as e:
-            messagebox.showerror("Error", f"Could not write to {filename}: {str(e)}")
+            messagebox.showerror("Error", f"Could not move line to {category}: {str(e)}")
     
     def on_exit(self):
         # Save file if modified before exiting
@@ -243,8 +377,12 @@ class LineSorterGUI:
         self.root.after(3000, lambda: self.status_label.config(text="Ready"))
 
 def main():
+    profiling.install('bd-browser-highlighter')
+    tk_instrument.install()
     root = tk.Tk()
+    tk_instrument.watch(root)
     app = LineSorterGUI(root)
+    profiling.snapshot('braindump loaded')
     root.mainloop()
 
 if __name__ == "__main__":
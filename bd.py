@@ -1,22 +1,15 @@
-# The name of the file where we will store our entries.
-FILENAME = "/home/clawber/projects/py-assist/output/braindump.txt"
+import profiling
+import storage
+
 
 def add_to_top_of_file(text):
     """
-    Adds a new line of text to the very beginning of the file.
+    Adds a new entry to the top of the braindump (newest first).
     """
-    try:
-        with open(FILENAME, 'r') as f:
-            original_content = f.read()
-    except FileNotFoundError:
-        original_content = ""
-
-    new_content = text + "\n" + original_content
+    with profiling.operation('add_to_top_of_file'):
+        storage.add_entry(storage.BRAINDUMP, text)
 
-    with open(FILENAME, 'w') as f:
-        f.write(new_content)
-    
-    # print(f"✅ Added '{text}' to the top of {FILENAME}")
+    # print(f"✅ Added '{text}' to the braindump")
 
 def main():
     """ The main function that runs the TUI loop. """
@@ -24,6 +17,7 @@ def main():
     print("Type what you want to do and press Enter.")
     print("Type 'quit' or 'exit' to stop the program.")
     print("-" * 26)
+    profiling.snapshot('startup')
 
     while True:
         user_input = input("> ")
@@ -39,6 +33,7 @@ def main():
 
 
 if __name__ == "__main__":
+    profiling.install('bd')
     main()
 
 # TODO: commands???
\ No newline at end of file
@@ -1,8 +1,11 @@
 #!/bin/bash
 
 # --- Configuration ---
-# The exact command to run your Python script. Use 'python3' and the full path.
-PYTHON_SCRIPT_COMMAND="python3 /home/clawber/projects/py-assist/bd.py"
+# py-assist lives next to this script
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+# The exact command to run your Python script.
+PYTHON_SCRIPT_COMMAND="python3 \"$SCRIPT_DIR/bd.py\""
 
 # This is the title you want your terminal window to have.
 # Make sure it's unique and specific.
@@ -15,22 +18,47 @@ WINDOW_TITLE="Braindump"
 # kitty
 # xfce4-terminal
 TERMINAL_EMULATOR="gnome-terminal"
+
+# Where a resident `wmctl.py serve` listens (see wmctl.py)
+WMCTL_SOCKET="${WMCTL_SOCKET:-${TMPDIR:-/tmp}/py-assist-wmctl-$UID.sock}"
 # ---------------------
 
-# Get the Window ID (WID) of the terminal running your script, if it's open
-# We use --name with the exact WINDOW_TITLE we set when launching.
-WID=$(xdotool search --name "$WINDOW_TITLE" 2>/dev/null)
+# Toggle the window. The status is 0 when it was minimized/activated, 2
+# when no such window exists, and 3 when python-xlib or the display is
+# unavailable. The resident server is asked directly over its socket, so
+# no Python process starts for a hotkey press.
+STATUS=""
+if [ -S "$WMCTL_SOCKET" ]; then
+    if command -v socat >/dev/null 2>&1; then
+        STATUS=$(printf 'toggle %s\n' "$WINDOW_TITLE" | socat -T 2 - "UNIX-CONNECT:$WMCTL_SOCKET" 2>/dev/null)
+    elif command -v nc >/dev/null 2>&1; then
+        STATUS=$(printf 'toggle %s\n' "$WINDOW_TITLE" | nc -w 2 -U "$WMCTL_SOCKET" 2>/dev/null)
+    fi
+    [[ "$STATUS" =~ ^[0-9]+$ ]] || STATUS=""
+fi
+
+if [ -z "$STATUS" ]; then
+    # No server answered (none running, or only a stale socket file left
+    # by one that died): toggle from a one-off process, and start the
+    # server for the next press. `serve` replaces a stale socket and holds
+    # a lock, so if a server is already running or starting it just exits.
+    WMCTL_SOCKET="$WMCTL_SOCKET" setsid python3 "$SCRIPT_DIR/wmctl.py" serve >/dev/null 2>&1 < /dev/null &
+    WMCTL_SOCKET="$WMCTL_SOCKET" python3 "$SCRIPT_DIR/wmctl.py" toggle "$WINDOW_TITLE"
+    STATUS=$?
+fi
 
-if [ -z "$WID" ]; then
+if [ "$STATUS" -eq 2 ]; then
     # Window not found, so launch the script in a new terminal
     # Use the -e flag to execute the command, and --title to set the window title.
     # The 'bash -c ...; exec bash' part ensures the terminal stays open after your Python script finishes.
     "$TERMINAL_EMULATOR" --title="$WINDOW_TITLE" -e "bash -c '$PYTHON_SCRIPT_COMMAND; exec bash'" &
-else
-    # Window found, check if it's currently active (focused)
-    ACTIVE_WID=$(xdotool getactivewindow)
+elif [ "$STATUS" -ne 0 ]; then
+    # Fall back to xdotool
+    WID=$(xdotool search --name "$WINDOW_TITLE" 2>/dev/null | head -n 1)
 
-    if [ "$WID" = "$ACTIVE_WID" ]; then
+    if [ -z "$WID" ]; then
+        "$TERMINAL_EMULATOR" --title="$WINDOW_TITLE" -e "bash -c '$PYTHON_SCRIPT_COMMAND; exec bash'" &
+    elif [ "$WID" = "$(xdotool getactivewindow)" ]; then
         # Script's terminal is active, minimize it
         xdotool windowminimize "$WID"
     else
@@ -0,0 +1,63 @@
+"""
+Measures alarm-to-sink latency of the cached alarm player.
+
+Uses the null sink, so it runs without sound hardware. Compares the cost of
+decoding the alarm WAV from disk with playing it from the cache, including
+bursts of overlapping alarms.
+
+    python3 benchmarks/bench_alarm_audio.py --alarms 200 --burst 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import alarm_audio
+
+ALARM_SOUND_FILE = "alarm-rooster.wav"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100.0))]
+
+
+def run(alarms=200, burst=5):
+    start = time.perf_counter()
+    alarm_audio._cache.pop(alarm_audio.resolve_sound(ALARM_SOUND_FILE), None)
+    alarm_audio.load_wav(ALARM_SOUND_FILE)
+    decode_ms = (time.perf_counter() - start) * 1000.0
+
+    sink = alarm_audio.NullSink()
+    player = alarm_audio.AlarmPlayer(sink=sink, history=alarms)
+    for _ in range(alarms // burst):
+        for _ in range(burst):
+            player.play(ALARM_SOUND_FILE)
+        player.wait_idle()
+    player.close()
+
+    latencies_ms = [s * 1000.0 for s in player.latencies]
+    return {
+        "decode_ms": decode_ms,
+        "alarms": len(sink.played),
+        "latency_p50_ms": percentile(latencies_ms, 50),
+        "latency_p99_ms": percentile(latencies_ms, 99),
+        "latency_max_ms": max(latencies_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--alarms", type=int, default=200)
+    parser.add_argument("--burst", type=int, default=5, help="alarms raised at the same moment")
+    args = parser.parse_args()
+
+    for key, value in run(args.alarms, args.burst).items():
+        print(f"{key:>15}: {value:.3f}" if isinstance(value, float) else f"{key:>15}: {value}")
+
+
+if __name__ == "__main__":
+    main()
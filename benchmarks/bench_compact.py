@@ -0,0 +1,87 @@
+"""
+Measures bytes per entry of the compact containers against plain Python ones.
+
+Each container is filled with fresh str objects, the way reading a file
+or a database produces them, and its retained size is taken from
+tracemalloc. It compares:
+
+- line stores: list[str] vs LineStore
+- time logs: the old {ISO timestamp: task} dict vs TimeLog
+
+    python3 benchmarks/bench_compact.py --entries 1000000 --distinct 5000
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import corpus
+from compact import LineStore, TimeLog
+
+MANILA = timezone(timedelta(hours=8))
+
+
+def fresh(strings):
+    """Yields a new str object for each string, like decoding each line from disk."""
+    for s in strings:
+        yield s.encode('utf-8').decode('utf-8')
+
+
+def retained(build):
+    """Bytes still allocated after build() returns, and what it built."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, default=5000, help="distinct lines/tasks in the corpus")
+    args = parser.parse_args()
+
+    n = args.entries
+    lines = corpus.repeated_lines(n, args.distinct)
+    stamps = [stamp for stamp, _ in corpus.tasks(n)]
+
+    results = []
+    size, _ = retained(lambda: list(fresh(lines)))
+    results.append(("lines: list[str]", size))
+    size, _ = retained(lambda: LineStore(fresh(lines)))
+    results.append(("lines: LineStore", size))
+
+    def old_time_log():
+        # The shape timetracker.load_data() used: ISO timestamp -> task
+        return {
+            datetime.fromtimestamp(stamp / 1000, MANILA).isoformat(): task
+            for stamp, task in zip(stamps, fresh(lines))
+        }
+
+    def new_time_log():
+        log = TimeLog()
+        log.extend(zip(stamps, [28800] * n, fresh(lines)))
+        return log
+
+    size, _ = retained(old_time_log)
+    results.append(("time log: dict[iso, str]", size))
+    size, _ = retained(new_time_log)
+    results.append(("time log: TimeLog", size))
+
+    print(f"{n:,} entries, {args.distinct:,} distinct texts")
+    for name, size in results:
+        print(f"{name:<26} {size / 2**20:>9.1f} MiB  {size / n:>7.1f} bytes/entry")
+
+
+if __name__ == "__main__":
+    main()
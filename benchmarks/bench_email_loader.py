@@ -0,0 +1,78 @@
+"""
+Compares memory and time of json.load with the streaming email loader.
+
+Generates a file of synthetic emails (JSON array or JSON lines) and runs
+both the old whole-file json.load and validate_email_file() over it,
+reporting peak traced memory for each.
+
+    python3 benchmarks/bench_email_loader.py --emails 300000 --format json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "email-scheduler"))
+
+from email_loader import validate_email_file
+
+
+def write_emails(path, n, fmt):
+    with open(path, "w", encoding="utf-8") as f:
+        if fmt == "json":
+            f.write("[")
+        for i in range(n):
+            record = json.dumps({
+                "to": f"user{i}@example.com",
+                "subject": f"Campaign update #{i % 50}",
+                "body": "Hello,\n\nThis is a synthetic message body for benchmarking. " * 3,
+                "send_time": f"2025-08-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}",
+            })
+            if fmt == "json":
+                f.write(record if i == 0 else "," + record)
+            else:
+                f.write(record + "\n")
+        if fmt == "json":
+            f.write("]")
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--emails", type=int, default=300000)
+    parser.add_argument("--format", choices=("json", "jsonl"), default="json")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, f"emails.{args.format}")
+        write_emails(path, args.emails, args.format)
+        print(f"{args.emails} emails, {os.path.getsize(path) / 1e6:.1f} MB on disk")
+
+        def old_path():
+            with open(path, encoding="utf-8") as f:
+                if args.format == "json":
+                    json.load(f)
+                else:
+                    [json.loads(line) for line in f]
+
+        for name, fn in (("json.load", old_path), ("streaming", lambda: validate_email_file(path))):
+            elapsed, peak = measure(fn)
+            print(f"{name:>10}: {elapsed:.2f}s, peak {peak / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
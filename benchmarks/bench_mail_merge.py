@@ -0,0 +1,89 @@
+"""
+Messages per second: the old create_message path vs the mail-merge engine.
+
+The baseline renders with string.Template and builds a MIMEMultipart per
+email, as email-scheduler.py's create_message did. The new path renders
+precompiled templates and encodes with MessageEncoder, in-process and in
+a process pool.
+
+    python3 benchmarks/bench_mail_merge.py --emails 20000
+"""
+
+import argparse
+import base64
+import os
+import string
+import sys
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "email-scheduler"))
+
+from mail_merge import Campaign, encode_messages
+
+SENDER = "me@example.com"
+TEMPLATE = {
+    "to": "$first $last <$email>",
+    "subject": "Your $plan plan renews on $date",
+    "body": "Hi $first,\n\nYour $plan subscription renews on $date.\n"
+            "Reply to this email if you have any questions.\n\nThanks!\n" * 2,
+    "send_time": "2025-08-15 14:30",
+}
+
+
+def create_message(to, subject, body, sender_email):
+    """Copy of the original email-scheduler create_message, for comparison."""
+    message = MIMEMultipart()
+    message['to'] = to
+    message['subject'] = subject
+    message['from'] = sender_email
+    message.attach(MIMEText(body, 'plain'))
+    raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+    return {'raw': raw_message}
+
+
+def make_rows(n):
+    return [
+        {"first": f"User{i}", "last": "Example", "email": f"user{i}@example.com",
+         "plan": ("basic", "pro", "team")[i % 3], "date": f"2025-09-{1 + i % 28:02d}"}
+        for i in range(n)
+    ]
+
+
+def run_baseline(rows):
+    templates = {k: string.Template(v) for k, v in TEMPLATE.items()}
+    for row in rows:
+        rendered = {k: t.substitute(row) for k, t in templates.items()}
+        create_message(rendered["to"], rendered["subject"], rendered["body"], SENDER)
+
+
+def run_engine(rows, processes):
+    campaign = Campaign(TEMPLATE, data_file=None)
+    items = ((r["to"], r["subject"], r["body"], None) for r in map(campaign.render, rows))
+    for _ in encode_messages(SENDER, items, processes):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--emails", type=int, default=20000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    rows = make_rows(args.emails)
+    runs = (
+        ("create_message", lambda: run_baseline(rows)),
+        ("engine", lambda: run_engine(rows, 0)),
+        (f"engine x{args.processes}", lambda: run_engine(rows, args.processes)),
+    )
+    for name, fn in runs:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        print(f"{name:>15}: {args.emails / elapsed:,.0f} messages/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Exercises the local send queue at scale with a fake clock and fake Gmail.
+
+Enqueues N emails spread over a simulated month, dispatches them all
+(the fake clock jumps instead of sleeping), simulates a crash in the
+middle of a batch, and checks that nothing was sent twice.
+
+    python3 benchmarks/bench_send_queue.py --emails 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "email-scheduler"))
+
+from fake_gmail import FakeGmailService
+from send_queue import SendQueue, message_id_for, run_dispatcher
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def fake_raw(key):
+    import base64
+    raw = f"Message-ID: {message_id_for(key)}\r\nTo: x@example.com\r\n\r\nhi\r\n".encode()
+    return {"raw": base64.urlsafe_b64encode(raw).decode()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--emails", type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    start_s = 1_750_000_000
+    clock = FakeClock(start_s)
+    service = FakeGmailService(seed=1, sleep=clock.sleep)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        queue = SendQueue(os.path.join(workdir, "queue.db"))
+        rows = [
+            (f"k{i}", (start_s + rng.randint(0, 30 * 86400)) * 1000, f"user{i}@example.com", fake_raw(f"k{i}"))
+            for i in range(args.emails)
+        ]
+
+        t = time.perf_counter()
+        added = queue.enqueue_many(rows)
+        enqueue_s = time.perf_counter() - t
+        again = queue.enqueue_many(rows[:1000])
+        print(f"enqueue: {added} rows in {enqueue_s:.2f}s ({enqueue_s / added * 1e6:.1f} us/row), "
+              f"re-enqueue of 1000 duplicates added {again}")
+
+        # Simulate a crash: claim and send a batch without recording the outcome
+        clock.now = start_s + 30 * 86400
+        crashed = queue.claim_due(int(clock.time() * 1000), 50)
+        for email in crashed[:30]:
+            service.users().messages().send(userId="me", body=email.body).execute()
+        clock.now = start_s
+
+        t = time.perf_counter()
+        sent = sum(1 for r in run_dispatcher(queue, service, clock=clock.time, sleep=clock.sleep, rate=1e9, burst=1e9)
+                   if r.status == "sent")
+        dispatch_s = time.perf_counter() - t
+        print(f"dispatch: {sent} sent in {dispatch_s:.2f}s wall "
+              f"({dispatch_s / max(sent, 1) * 1e6:.1f} us/email), {service.batches} batches")
+        print(f"recovery: {len(crashed)} in flight at crash, 30 already in Gmail")
+        print(f"gmail received {len(service.sent)} messages for {args.emails} queued "
+              f"-> {'no duplicates' if len(service.sent) == args.emails else 'DUPLICATES/MISSING'}")
+        print(f"queue: {queue.counts()}")
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
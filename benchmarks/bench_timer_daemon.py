@@ -0,0 +1,113 @@
+"""
+Compares the resident footprint of the headless timer daemon with TimerApp.
+
+Both run in their own process with the same set of timers. After a settling
+period we read RSS and voluntary context switches (a proxy for wakeups)
+from /proc. The Tk side needs a display; it is skipped when DISPLAY is unset.
+
+    python3 benchmarks/bench_timer_daemon.py --timers 10 --seconds 30
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from timer_daemon import send_command
+
+TK_APP = """
+import sys, tkinter as tk
+import timer
+timer.TIMERS_FILE = sys.argv[1]
+root = tk.Tk()
+app = timer.TimerApp(root)
+for i, seconds in enumerate(map(float, sys.argv[2:])):
+    app.engine.add(seconds, label=f"t{i}")
+app.refresh_timer_list()
+app.schedule_next()
+root.mainloop()
+"""
+
+
+def durations(timers, seconds):
+    """Timer lengths in seconds, the same for both sides and none firing while measured."""
+    return [3600 + seconds + i for i in range(timers)]
+
+
+def proc_status(pid):
+    """Returns (rss_kb, voluntary_ctxt_switches) for a process."""
+    rss = switches = 0
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1])
+            elif line.startswith("voluntary_ctxt_switches:"):
+                switches = int(line.split()[1])
+    return rss, switches
+
+
+def measure(proc, seconds):
+    time.sleep(1.0)  # let startup finish before counting
+    rss, before = proc_status(proc.pid)
+    time.sleep(seconds)
+    rss, after = proc_status(proc.pid)
+    return {"rss_kb": rss, "wakeups_per_min": (after - before) * 60.0 / seconds}
+
+
+def run_daemon(lengths, seconds, workdir):
+    sock = os.path.join(workdir, "timer.sock")
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "timer_daemon.py"),
+         "--socket", sock, "--file", os.path.join(workdir, "daemon.json"), "--no-alert", "serve"],
+        stdout=subprocess.DEVNULL, cwd=ROOT,
+    )
+    try:
+        for _ in range(50):
+            if os.path.exists(sock):
+                break
+            time.sleep(0.1)
+        for i, length in enumerate(lengths):
+            send_command(f"start {length / 60!r} t{i}", sock)
+        return measure(proc, seconds)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def run_tk(lengths, seconds, workdir):
+    proc = subprocess.Popen(
+        [sys.executable, "-c", TK_APP, os.path.join(workdir, "tk.json")] + [repr(n) for n in lengths],
+        stdout=subprocess.DEVNULL, cwd=ROOT,
+    )
+    try:
+        return measure(proc, seconds)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--timers", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    lengths = durations(args.timers, args.seconds)
+    with tempfile.TemporaryDirectory() as workdir:
+        results = {"daemon": run_daemon(lengths, args.seconds, workdir)}
+        if os.environ.get("DISPLAY"):
+            results["tk"] = run_tk(lengths, args.seconds, workdir)
+        else:
+            print("DISPLAY not set; skipping the Tk comparison.")
+
+    for name, r in results.items():
+        print(f"{name:>7}: rss {r['rss_kb'] / 1024:.1f} MiB, {r['wakeups_per_min']:.1f} wakeups/min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Measures drift and CPU use of TimerEngine with many concurrent timers.
+
+Runs the same wake-on-next-deadline loop TimerApp uses, with real sleeps,
+and reports how late each timer fired plus the CPU time spent. With
+--persist the engine saves to a temporary timers.json as TimerApp's does,
+and the cost of saving is measured too: starting and stopping the timers
+one save per change versus one save per batch (one UI action).
+
+    python3 benchmarks/bench_timer_engine.py --timers 1000 --spread 5 --persist
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timer_engine import TimerEngine
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(len(ordered) * pct / 100.0))
+    return ordered[index]
+
+
+def run(timers=1000, spread=5.0, busy_ms=0.0, seed=1, path=None):
+    """
+    Starts `timers` timers spread over `spread` seconds and waits for all of
+    them. `busy_ms` simulates other work blocking the loop on every wakeup.
+    """
+    rng = random.Random(seed)
+    engine = TimerEngine(path)
+    with engine.batch():
+        for i in range(timers):
+            engine.add(rng.uniform(0.05, spread), label=f"t{i}")
+
+    lateness_ms = []
+    wakeups = 0
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    while len(engine):
+        wait = engine.seconds_until_next()
+        if wait:
+            time.sleep(wait)
+        wakeups += 1
+        now = time.monotonic()
+        for timer in engine.pop_due(now):
+            lateness_ms.append((now - timer.deadline) * 1000.0)
+        if busy_ms:
+            end = time.perf_counter() + busy_ms / 1000.0
+            while time.perf_counter() < end:
+                pass
+
+    return {
+        "timers": timers,
+        "spread_s": spread,
+        "busy_ms": busy_ms,
+        "wakeups": wakeups,
+        "wall_s": time.perf_counter() - wall_start,
+        "cpu_s": time.process_time() - cpu_start,
+        "drift_mean_ms": sum(lateness_ms) / len(lateness_ms),
+        "drift_p99_ms": percentile(lateness_ms, 99),
+        "drift_max_ms": max(lateness_ms),
+    }
+
+
+def save_costs(timers, path):
+    """Seconds to start `timers` timers and then stop them all one by one, with and without batch()."""
+    results = {}
+    for batched in (False, True):
+        engine = TimerEngine(path)
+        start = time.perf_counter()
+        with engine.batch() if batched else contextlib.nullcontext():
+            for i in range(timers):
+                engine.add(3600 + i, label=f"t{i}")
+        added = time.perf_counter()
+        with engine.batch() if batched else contextlib.nullcontext():
+            for timer in engine.active():
+                engine.cancel(timer.id)
+        stopped = time.perf_counter()
+        name = "batched" if batched else "per_change"
+        results[f"start_{name}_s"] = added - start
+        results[f"stop_{name}_s"] = stopped - added
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--timers", type=int, default=1000)
+    parser.add_argument("--spread", type=float, default=5.0, help="seconds over which timers expire")
+    parser.add_argument("--busy-ms", type=float, default=0.0, help="simulated loop work per wakeup")
+    parser.add_argument("--persist", action="store_true", help="save to a timers.json like TimerApp does")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "timers.json") if args.persist else None
+        result = run(args.timers, args.spread, args.busy_ms, path=path)
+        if path:
+            result.update(save_costs(args.timers, path))
+    for key, value in result.items():
+        print(f"{key:>18}: {value:.3f}" if isinstance(value, float) else f"{key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Times the time-log display path: rendering a bulk view of logged tasks.
+
+Renders every entry of a TimeLog as timetracker.display_tasks() prints it
+("[YYYY-MM-DD HH:MM:SS] task") into a buffer, three ways:
+
+- iso: the original time_log.json path, fromisoformat() + strftime()
+- datetime: per-entry fixed-offset datetime + strftime()
+- timeutil: timeutil.format_local() (arithmetic + memoized date prefix)
+
+and checks that all three produce the same text. It also times getting
+the current timestamp with the zone looked up per call against the
+zone resolved once, each ending in the (epoch_ms, utc_offset) pair
+storage keeps (pytz is included when it is installed).
+
+    python3 benchmarks/bench_timeutil.py --entries 100000
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import corpus
+import timeutil
+from compact import TimeLog
+
+ZONE_NAME = 'Asia/Manila'
+# Mostly Manila, with some entries logged while travelling
+OFFSETS = (28800, 28800, 28800, -14400, 3600, 19800)
+
+
+def render_iso(stamps):
+    out = io.StringIO()
+    for stamp, task in stamps:
+        display_ts = datetime.fromisoformat(stamp).strftime("%Y-%m-%d %H:%M:%S")
+        out.write(f"[{display_ts}] {task}\n")
+    return out.getvalue()
+
+
+def render_datetime(log):
+    out = io.StringIO()
+    for entry in log:
+        tz = timezone(timedelta(seconds=entry.utc_offset))
+        display_ts = datetime.fromtimestamp(entry.created_at / 1000, tz).strftime("%Y-%m-%d %H:%M:%S")
+        out.write(f"[{display_ts}] {entry.text}\n")
+    return out.getvalue()
+
+
+def render_timeutil(log):
+    out = io.StringIO()
+    for entry in log:
+        display_ts = timeutil.format_local(entry.created_at, entry.utc_offset)
+        out.write(f"[{display_ts}] {entry.text}\n")
+    return out.getvalue()
+
+
+def best_of(repeat, func, *args):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def stored_pair(dt):
+    """What save_data() used to derive from the aware datetime."""
+    return int(dt.timestamp() * 1000), int(dt.utcoffset().total_seconds())
+
+
+def timestamp_rates(calls):
+    """Seconds per call for each way of getting 'now' as (epoch_ms, utc_offset)."""
+    rates = []
+    try:
+        import pytz
+    except ImportError:
+        pytz = None
+    if pytz:
+        start = time.perf_counter()
+        for _ in range(calls):
+            stored_pair(datetime.now(pytz.timezone(ZONE_NAME)))
+        rates.append(("pytz.timezone() per call", (time.perf_counter() - start) / calls))
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        stored_pair(datetime.now(ZoneInfo(ZONE_NAME)))
+    rates.append(("ZoneInfo() per call", (time.perf_counter() - start) / calls))
+
+    zone = timeutil.zone(ZONE_NAME)
+    start = time.perf_counter()
+    for _ in range(calls):
+        timeutil.now(zone)
+    rates.append(("timeutil.now(cached zone)", (time.perf_counter() - start) / calls))
+    return rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--calls", type=int, default=100_000, help="timestamp calls to time")
+    args = parser.parse_args()
+
+    log = TimeLog()
+    for i, (stamp, task) in enumerate(corpus.tasks(args.entries)):
+        log.append(stamp, OFFSETS[i % len(OFFSETS)], task)
+    iso_log = [
+        (datetime.fromtimestamp(entry.created_at / 1000, timezone(timedelta(seconds=entry.utc_offset))).isoformat(), entry.text)
+        for entry in log
+    ]
+
+    results = [
+        ("iso", best_of(args.repeat, render_iso, iso_log)),
+        ("datetime", best_of(args.repeat, render_datetime, log)),
+        ("timeutil", best_of(args.repeat, render_timeutil, log)),
+    ]
+    expected = results[0][1][1]
+    baseline = results[1][1][0]
+    print(f"bulk view of {args.entries:,} entries (best of {args.repeat})")
+    for name, (elapsed, text) in results:
+        same = "ok" if text == expected else "MISMATCH"
+        print(f"  {name:<10} {elapsed * 1000:>9.1f} ms  {elapsed / args.entries * 1e6:>6.2f} us/entry"
+              f"  x{baseline / elapsed:>5.2f}  {same}")
+
+    print(f"current timestamp ({args.calls:,} calls)")
+    for name, per_call in timestamp_rates(args.calls):
+        print(f"  {name:<26} {per_call * 1e6:>7.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Times a hotkey window toggle end to end, the old ways against the new.
+
+- xdotool: search + getactivewindow + windowactivate/minimize, spawned per
+  toggle like bd_script.sh used to
+- python3 wmctl.py: a one-off Python process per toggle (no server)
+- bd_script.sh: the real hotkey script, talking to a resident
+  `wmctl.py serve` through socat/nc
+- wmctl (connect) / (warm): WindowController.toggle() in this process,
+  with and without connecting first
+
+A Tk window whose title contains "Braindump" is the target. The benchmark
+runs on its own Xvfb when that is installed, so it can't toggle your real
+Braindump window, and falls back to DISPLAY otherwise.
+
+    python3 benchmarks/bench_wmctl.py --toggles 200
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import wmctl
+
+TITLE = "Braindump (wmctl benchmark)"
+SCRIPT = os.path.join(ROOT, "bd_script.sh")
+TK_WINDOW = """
+import sys, tkinter as tk
+root = tk.Tk()
+root.title(sys.argv[1])
+root.mainloop()
+"""
+
+
+def start_xvfb():
+    """Starts Xvfb on a free display number; returns the process or None."""
+    if not shutil.which("Xvfb"):
+        return None
+    for number in range(99, 120):
+        if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            continue
+        proc = subprocess.Popen(["Xvfb", f":{number}", "-screen", "0", "1024x768x24"],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(50):
+            if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                os.environ["DISPLAY"] = f":{number}"
+                return proc
+            time.sleep(0.1)
+        proc.terminate()
+    return None
+
+
+def xdotool_toggle(title):
+    wid = subprocess.run(["xdotool", "search", "--name", title],
+                         capture_output=True, text=True).stdout.split()
+    if not wid:
+        return None
+    active = subprocess.run(["xdotool", "getactivewindow"], capture_output=True, text=True).stdout.strip()
+    if wid[0] == active:
+        subprocess.run(["xdotool", "windowminimize", wid[0]], capture_output=True)
+        return "minimized"
+    subprocess.run(["xdotool", "windowactivate", wid[0]], capture_output=True)
+    subprocess.run(["xdotool", "windowraise", wid[0]], capture_output=True)
+    return "activated"
+
+
+def script_toggle(env):
+    subprocess.run(["bash", SCRIPT], env=env, capture_output=True)
+
+
+def start_server(env, socket_path):
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "wmctl.py"), "serve"], env=env)
+    for _ in range(50):
+        if os.path.exists(socket_path):
+            return proc
+        time.sleep(0.1)
+    proc.terminate()
+    proc.wait()
+    return None
+
+
+def connect_and_toggle(title):
+    controller = wmctl.WindowController()
+    try:
+        return controller.toggle(title)
+    finally:
+        controller.close()
+
+
+def time_calls(func, toggles):
+    samples = []
+    for _ in range(toggles):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {"median_ms": statistics.median(samples), "p95_ms": samples[int(len(samples) * 0.95) - 1]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--toggles", type=int, default=200)
+    args = parser.parse_args()
+
+    if wmctl.xdisplay is None:
+        print("python-xlib is not installed; nothing to measure.")
+        return
+    xvfb = start_xvfb()
+    if not os.environ.get("DISPLAY"):
+        print("No DISPLAY and no Xvfb; nothing to measure.")
+        return
+
+    workdir = tempfile.mkdtemp()
+    socket_path = os.path.join(workdir, "wmctl.sock")
+    env = dict(os.environ, WMCTL_SOCKET=socket_path)
+    window = subprocess.Popen([sys.executable, "-c", TK_WINDOW, TITLE])
+    controller = server = None
+    results = {}
+    try:
+        controller = wmctl.WindowController()
+        for _ in range(50):
+            if controller.find(TITLE):
+                break
+            time.sleep(0.1)
+        else:
+            print("The test window never appeared.")
+            return
+
+        if shutil.which("xdotool"):
+            results["xdotool"] = time_calls(lambda: xdotool_toggle(TITLE), args.toggles)
+        else:
+            print("xdotool not installed; skipping it.")
+        # No server is listening on socket_path yet, so this is the cold path
+        one_off = [sys.executable, os.path.join(ROOT, "wmctl.py"), "toggle", TITLE]
+        results["python3 wmctl.py"] = time_calls(
+            lambda: subprocess.run(one_off, env=env, capture_output=True), args.toggles)
+
+        if shutil.which("socat") or shutil.which("nc"):
+            server = start_server(env, socket_path)
+        if server:
+            results["bd_script.sh"] = time_calls(lambda: script_toggle(env), args.toggles)
+        else:
+            print("No socat/nc (or the server didn't start); skipping bd_script.sh.")
+
+        # Includes connecting, as a hotkey press without `wmctl.py serve` would
+        results["wmctl (connect)"] = time_calls(lambda: connect_and_toggle(TITLE), args.toggles)
+        results["wmctl (warm)"] = time_calls(lambda: controller.toggle(TITLE), args.toggles)
+    finally:
+        if controller:
+            controller.close()
+        if server:
+            server.terminate()
+            server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+        window.terminate()
+        window.wait()
+        if xvfb:
+            xvfb.terminate()
+            xvfb.wait()
+
+    for name, r in results.items():
+        print(f"{name:>17}: median {r['median_ms']:.2f} ms, p95 {r['p95_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Seeded generators for realistic benchmark data.
+
+Everything is derived from a fixed word list and a seeded random.Random,
+so the same scale always produces the same corpus.
+"""
+
+import json
+import random
+
+SCALES = {'1k': 1_000, '100k': 100_000, '1M': 1_000_000}
+
+WORDS = (
+    "the a to and of in for on with at from by about as into like through after over between out "
+    "against during without before under around among fix write call email read plan review check "
+    "buy clean send update book pay finish start meeting report project code bug test deploy design "
+    "notes idea client budget invoice draft slides doctor groceries gym laundry dinner trip flight "
+    "hotel birthday gift team standup sprint release branch server database backup password account "
+    "friday monday weekend tomorrow today morning evening urgent later maybe quick long small big "
+    "new old first last next important remember ask tell think learn try finally again soon"
+).split()
+
+COMMAND_VERBS = ('show', 'set', 'get', 'reboot', 'open', 'close', 'list', 'add', 'remove', 'sync')
+COMMAND_NOUNS = ('status', 'version', 'user', 'log_level', 'system', 'device', 'timer', 'task',
+                 'file', 'window', 'profile', 'queue', 'backup', 'network', 'display', 'audio')
+
+
+def sentence(rng, low=3, high=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def braindump_lines(n, seed=1):
+    """n short free-text notes, like the ones typed into bd.py."""
+    rng = random.Random(seed)
+    return [sentence(rng) for _ in range(n)]
+
+
+def repeated_lines(n, distinct=5000, seed=5):
+    """
+    n notes drawn from `distinct` different ones with a Zipf-like skew, the
+    way logged tasks and sorted lines repeat ("coding", "lunch", ...).
+    """
+    rng = random.Random(seed)
+    pool = [sentence(rng, 1, 8) for _ in range(distinct)]
+    weights = [1.0 / (rank + 1) for rank in range(distinct)]
+    return rng.choices(pool, weights, k=n)
+
+
+def commands(n, seed=2):
+    """n distinct-looking autocomplete commands ('show status', 'set user 17', ...)."""
+    rng = random.Random(seed)
+    return [f"{rng.choice(COMMAND_VERBS)} {rng.choice(COMMAND_NOUNS)} {i}" for i in range(n)]
+
+
+def tasks(n, seed=3, start_ms=1_735_660_800_000, span_days=365):
+    """n (epoch_ms, task) pairs spread over span_days, oldest first."""
+    rng = random.Random(seed)
+    stamps = sorted(start_ms + rng.randrange(span_days * 86_400_000) for _ in range(n))
+    return [(stamp, sentence(rng, 1, 6)) for stamp in stamps]
+
+
+def emails(n, seed=4):
+    """n email records in the scheduler's file format."""
+    rng = random.Random(seed)
+    return [
+        {
+            'to': f"user{i}@example.com",
+            'subject': sentence(rng, 2, 6).capitalize(),
+            'body': '\n'.join(sentence(rng, 5, 15) for _ in range(rng.randint(1, 6))),
+            'send_time': f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.choice((0, 15, 30, 45)):02d}",
+        }
+        for i in range(n)
+    ]
+
+
+def write_json_lines(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record))
+            f.write('\n')
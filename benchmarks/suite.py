@@ -0,0 +1,392 @@
+"""
+Benchmark suite for the py-assist hot paths, with JSON baselines.
+
+Runs every case on generated data at one scale (1k, 100k or 1M items),
+records timings as JSON and compares runs against a baseline, flagging
+cases that got slower than a threshold. Tk cases need a display; without
+DISPLAY, Xvfb is started when installed, otherwise they are skipped.
+
+    python3 benchmarks/suite.py run --scale 100k -o benchmarks/baselines/laptop-100k.json
+    python3 benchmarks/suite.py run --scale 1k --only fuzzy,mail
+    python3 benchmarks/suite.py compare old.json new.json --threshold 0.15
+    python3 benchmarks/suite.py check benchmarks/baselines/laptop-100k.json   # run + compare
+
+`compare` and `check` exit with 1 when anything regressed.
+"""
+
+import argparse
+import contextlib
+import gc
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'email-scheduler'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import corpus
+import storage
+
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_ROUNDS = 5
+DEFAULT_BUDGET = 2.0  # stop repeating a case after this many seconds
+
+
+class Skip(Exception):
+    """Raised by a case's setup when it can't run here."""
+
+
+class Context:
+    """What a case's setup gets: the item count, a scratch dir and cleanup hooks."""
+
+    def __init__(self, n, workdir, display):
+        self.n = n
+        self.workdir = workdir
+        self.display = display
+        self._cleanups = []
+
+    def defer(self, func):
+        self._cleanups.append(func)
+
+    def cleanup(self):
+        while self._cleanups:
+            self._cleanups.pop()()
+
+    def store(self, name):
+        """Points storage at a fresh database for this case."""
+        storage.close()
+        original = storage.DB_FILE
+        storage.DB_FILE = os.path.join(self.workdir, f"{name}.db")
+        storage.connect(storage.DB_FILE)
+
+        def restore():
+            storage.close()
+            storage.DB_FILE = original
+        self.defer(restore)
+
+    def tk_root(self):
+        if not self.display:
+            raise Skip("no display")
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        self.defer(root.destroy)
+        return root
+
+
+CASES = []
+
+
+def case(name):
+    """Registers a setup function: setup(ctx) -> (timed_callable, ops_per_call)."""
+    def register(setup):
+        CASES.append((name, setup))
+        return setup
+    return register
+
+
+def load_module(name, filename):
+    """Imports a top-level script whose file name isn't a valid module name."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def import_timetracker():
+    try:
+        import timetracker
+    except ImportError as e:
+        raise Skip(f"timetracker needs {e.name}")
+    return timetracker
+
+
+# --- Cases ---
+
+@case('fuzzy_match')
+def bench_fuzzy_match(ctx):
+    from main import fuzzy_match
+    commands = corpus.commands(ctx.n)
+    queries = ('sv', 'rbt', 'lst 9', 'xq')
+
+    def run():
+        for query in queries:
+            [cmd for cmd in commands if fuzzy_match(query, cmd)]
+    return run, ctx.n * len(queries)
+
+
+@case('autocomplete_key_release')
+def bench_autocomplete(ctx):
+    root = ctx.tk_root()
+    from main import AutocompleteEntry
+    entry = AutocompleteEntry(root, autocomplete_list=corpus.commands(ctx.n))
+    entry.insert(0, 'sv')
+    event = types.SimpleNamespace(keysym='v')
+    return lambda: entry._on_key_release(event), 1
+
+
+@case('bd_add_to_top_of_file')
+def bench_bd_add(ctx):
+    import bd
+    ctx.store('bd')
+    storage.add_entries((storage.BRAINDUMP, line, None, i, 0) for i, line in enumerate(corpus.braindump_lines(ctx.n)))
+
+    def run():
+        for i in range(1000):
+            bd.add_to_top_of_file(f"bench note {i}")
+    return run, 1000
+
+
+@case('timetracker_save_data')
+def bench_timetracker_save(ctx):
+    timetracker = import_timetracker()
+    ctx.store('timetracker_save')
+    storage.add_entries((storage.TASK, task, None, stamp, 28800) for stamp, task in corpus.tasks(ctx.n))
+
+    def run():
+        for i in range(1000):
+            timetracker.save_data(timetracker.get_current_timestamp(), f"bench task {i}")
+    return run, 1000
+
+
+@case('timetracker_display_tasks')
+def bench_timetracker_display(ctx):
+    timetracker = import_timetracker()
+    ctx.store('timetracker_display')
+    storage.add_entries((storage.TASK, task, None, stamp, 28800) for stamp, task in corpus.tasks(ctx.n))
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(100):
+                timetracker.display_tasks(storage.recent(storage.TASK, 10))
+    return run, 100
+
+
+@case('storage_between')
+def bench_storage_between(ctx):
+    ctx.store('between')
+    tasks = corpus.tasks(ctx.n)
+    storage.add_entries((storage.TASK, task, None, stamp, 0) for stamp, task in tasks)
+    first = tasks[0][0]
+    days = [first + day * 86_400_000 for day in range(0, 360, 12)]
+
+    def run():
+        for start in days:
+            storage.between(start, start + 86_400_000)
+    return run, len(days)
+
+
+def line_sorter(ctx):
+    root = ctx.tk_root()
+    ctx.store('line_sorter')
+    highlighter = load_module('bd_browser_highlighter', 'bd-browser-highlighter.py')
+    app = highlighter.LineSorterGUI(root)
+    app.lines = corpus.braindump_lines(ctx.n)
+    app.entry_ids = []
+    app.current_file = os.path.join(ctx.workdir, 'braindump.txt')
+    return app
+
+
+@case('line_sorter_display_content')
+def bench_display_content(ctx):
+    app = line_sorter(ctx)
+    return app.display_content, ctx.n
+
+
+@case('line_sorter_sort_line_to_file')
+def bench_sort_line(ctx):
+    app = line_sorter(ctx)
+    app.display_content()
+
+    def run():
+        for _ in range(5):
+            app.sort_line_to_file('u')
+    return run, 5
+
+
+@case('mail_encode_message')
+def bench_mail_encode(ctx):
+    from mail_merge import MessageEncoder
+    encoder = MessageEncoder('Sender <me@example.com>')
+    emails = corpus.emails(ctx.n)
+
+    def run():
+        for i, email in enumerate(emails):
+            encoder.encode(email['to'], email['subject'], email['body'], f"<{i}@bench>")
+    return run, ctx.n
+
+
+@case('email_loader_iter_records')
+def bench_email_loader(ctx):
+    from email_loader import iter_email_records
+    path = os.path.join(ctx.workdir, 'emails.jsonl')
+    corpus.write_json_lines(path, corpus.emails(ctx.n))
+
+    def run():
+        for _ in iter_email_records(path):
+            pass
+    return run, ctx.n
+
+
+# --- Running ---
+
+def time_calls(func, rounds, budget):
+    samples = []
+    spent = 0.0
+    for _ in range(rounds):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed * 1000)
+        spent += elapsed
+        if spent >= budget:
+            break
+    return samples
+
+
+def ensure_display():
+    """Returns (has_display, xvfb process or None)."""
+    if os.environ.get('DISPLAY'):
+        return True, None
+    from bench_wmctl import start_xvfb
+    xvfb = start_xvfb()
+    return xvfb is not None, xvfb
+
+
+def run_suite(scale, only=None, rounds=DEFAULT_ROUNDS, budget=DEFAULT_BUDGET):
+    n = corpus.SCALES[scale]
+    has_display, xvfb = ensure_display()
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for name, setup in CASES:
+                if only and not any(pattern in name for pattern in only):
+                    continue
+                ctx = Context(n, workdir, has_display)
+                try:
+                    func, ops = setup(ctx)
+                    samples = time_calls(func, rounds, budget)
+                except Skip as e:
+                    results[name] = {'skipped': str(e)}
+                else:
+                    median = statistics.median(samples)
+                    results[name] = {
+                        'median_ms': median,
+                        'min_ms': min(samples),
+                        'rounds': len(samples),
+                        'ops': ops,
+                        'us_per_op': median * 1000 / ops,
+                    }
+                finally:
+                    ctx.cleanup()
+                print_result(name, results[name])
+    finally:
+        if xvfb:
+            xvfb.terminate()
+            xvfb.wait()
+
+    return {
+        'meta': {
+            'scale': scale,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'node': platform.node(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def print_result(name, result):
+    if 'skipped' in result:
+        print(f"{name:<32} skipped: {result['skipped']}")
+    else:
+        print(f"{name:<32} {result['median_ms']:>10.2f} ms  {result['us_per_op']:>10.3f} us/op  ({result['rounds']} rounds)")
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Prints a comparison; returns the names of cases that regressed."""
+    if baseline['meta']['scale'] != current['meta']['scale']:
+        print(f"Warning: comparing scale {baseline['meta']['scale']} against {current['meta']['scale']}")
+    regressed = []
+    for name, base in baseline['results'].items():
+        new = current['results'].get(name)
+        if new is None:
+            continue  # not run this time (--only)
+        if 'skipped' in base or 'skipped' in new:
+            print(f"{name:<32} not comparable")
+            continue
+        ratio = new['median_ms'] / base['median_ms'] if base['median_ms'] else float('inf')
+        if ratio > 1 + threshold:
+            flag = 'REGRESSION'
+            regressed.append(name)
+        elif ratio < 1 - threshold:
+            flag = 'faster'
+        else:
+            flag = ''
+        print(f"{name:<32} {base['median_ms']:>10.2f} -> {new['median_ms']:>10.2f} ms  {ratio:>6.2f}x  {flag}")
+    return regressed
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    print(f"Results written to {path}")
+
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the suite')
+    check_parser = commands.add_parser('check', help='run the suite and compare against a baseline')
+    check_parser.add_argument('baseline')
+    for sub in (run_parser, check_parser):
+        sub.add_argument('--only', help='comma-separated substrings of case names')
+        sub.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS)
+        sub.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help='seconds per case')
+        sub.add_argument('-o', '--output', help='write results as JSON')
+    run_parser.add_argument('--scale', choices=corpus.SCALES, default='1k')
+    check_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+
+    compare_parser = commands.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        regressed = compare(read_json(args.baseline), read_json(args.current), args.threshold)
+    else:
+        baseline = read_json(args.baseline) if args.command == 'check' else None
+        scale = baseline['meta']['scale'] if baseline else args.scale
+        only = args.only.split(',') if args.only else None
+        results = run_suite(scale, only, args.rounds, args.budget)
+        if args.output:
+            write_json(args.output, results)
+        regressed = compare(baseline, results, args.threshold) if baseline else []
+
+    if regressed:
+        print(f"{len(regressed)} case(s) regressed: {', '.join(regressed)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
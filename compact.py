@@ -0,0 +1,148 @@
+"""
+Compact in-memory containers for large line stores and logs.
+
+A list of a million short strings costs a pointer plus a full str object
+(about 50 bytes of header) per line, even when most lines repeat. These
+containers keep each distinct string once in a StringTable and store
+4-byte indexes (and 8-byte epoch timestamps) in `array`s instead.
+
+    lines = LineStore(["buy milk", "call mom", "buy milk"])   # 2 strings kept
+    log = TimeLog()
+    log.append(1735689600000, 28800, "coding")
+"""
+
+from array import array
+
+
+class StringTable:
+    """Keeps one copy of each distinct string and hands out small integer ids."""
+    __slots__ = ('_ids', 'strings')
+
+    def __init__(self):
+        self._ids = {}
+        self.strings = []
+
+    def add(self, text):
+        string_id = self._ids.get(text)
+        if string_id is None:
+            string_id = self._ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def __getitem__(self, string_id):
+        return self.strings[string_id]
+
+    def __len__(self):
+        return len(self.strings)
+
+
+class LineStore:
+    """
+    A list-like sequence of strings stored as ids into a StringTable.
+
+    Supports what the viewers use from a list: len, indexing, slicing,
+    iteration, append/extend/insert/pop, slice assignment and `in`.
+    Strings removed from the store stay in its table.
+    """
+    __slots__ = ('table', '_ids')
+
+    def __init__(self, lines=(), table=None):
+        self.table = StringTable() if table is None else table
+        self._ids = array('I', map(self.table.add, lines))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return map(self.table.strings.__getitem__, self._ids)
+
+    def __reversed__(self):
+        return map(self.table.strings.__getitem__, reversed(self._ids))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.table.strings[i] for i in self._ids[index]]
+        return self.table.strings[self._ids[index]]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._ids[index] = array('I', map(self.table.add, value))
+        else:
+            self._ids[index] = self.table.add(value)
+
+    def __delitem__(self, index):
+        del self._ids[index]
+
+    def __contains__(self, text):
+        string_id = self.table._ids.get(text)
+        return string_id is not None and string_id in self._ids
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"LineStore({list(self)!r})"
+
+    def append(self, text):
+        self._ids.append(self.table.add(text))
+
+    def extend(self, lines):
+        self._ids.extend(map(self.table.add, lines))
+
+    def insert(self, index, text):
+        self._ids.insert(index, self.table.add(text))
+
+    def pop(self, index=-1):
+        return self.table.strings[self._ids.pop(index)]
+
+
+class TaskRecord:
+    """One time-log entry as handed out by TimeLog."""
+    __slots__ = ('created_at', 'utc_offset', 'text')
+
+    def __init__(self, created_at, utc_offset, text):
+        self.created_at = created_at
+        self.utc_offset = utc_offset
+        self.text = text
+
+
+class TimeLog:
+    """
+    Time-log entries in parallel arrays: epoch milliseconds, UTC offsets in
+    seconds, and task ids into a StringTable (tasks repeat a lot).
+    """
+    __slots__ = ('table', 'created_at', 'utc_offset', '_text_ids')
+
+    def __init__(self, table=None):
+        self.table = StringTable() if table is None else table
+        self.created_at = array('q')
+        self.utc_offset = array('i')
+        self._text_ids = array('I')
+
+    def append(self, created_at, utc_offset, text):
+        self.created_at.append(created_at)
+        self.utc_offset.append(utc_offset)
+        self._text_ids.append(self.table.add(text))
+
+    def extend(self, rows):
+        """Adds (created_at, utc_offset, text) rows."""
+        for created_at, utc_offset, text in rows:
+            self.append(created_at, utc_offset, text)
+
+    def __len__(self):
+        return len(self.created_at)
+
+    def __getitem__(self, index):
+        return TaskRecord(self.created_at[index], self.utc_offset[index], self.table.strings[self._text_ids[index]])
+
+    def __iter__(self):
+        strings = self.table.strings
+        for created_at, utc_offset, text_id in zip(self.created_at, self.utc_offset, self._text_ids):
+            yield TaskRecord(created_at, utc_offset, strings[text_id])
+
+    def text(self, index):
+        return self.table.strings[self._text_ids[index]]
+
+    def newest(self, count):
+        """The last `count` records, newest first (entries are kept in time order)."""
+        return [self[i] for i in range(len(self) - 1, max(len(self) - count, 0) - 1, -1)]
@@ -0,0 +1,193 @@
+"""
+Batched, rate-limited sending for the email scheduler.
+
+Requests are grouped into Gmail batch HTTP requests (one round trip per
+batch instead of per email), paced by a token bucket so we stay under the
+per-user sending quota, and retried with exponential backoff and jitter
+when Gmail answers 429 or 5xx. Every email gets a DispatchResult.
+
+The service only needs users().messages().send() and
+new_batch_http_request(), so fake_gmail.FakeGmailService can stand in for
+it in tests and benchmarks.
+"""
+
+import heapq
+import itertools
+import random
+import time
+
+# --- Configuration ---
+# Gmail allows up to 100 calls per batch but recommends staying at or below 50.
+BATCH_SIZE = 50
+# messages.send costs 100 quota units and a user gets 250 units per second.
+SEND_RATE = 2.5
+SEND_BURST = 10
+MAX_ATTEMPTS = 5
+BASE_DELAY = 1.0
+MAX_DELAY = 32.0
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _transport_errors():
+    """Exception types that mean the round trip itself failed."""
+    errors = (OSError,)  # connection refused/reset, timeouts, TLS errors
+    try:
+        import httplib2
+        errors += (httplib2.HttpLib2Error,)
+    except ImportError:
+        pass
+    return errors
+
+
+TRANSPORT_ERRORS = _transport_errors()
+
+
+class TokenBucket:
+    """Allows `rate` operations per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, n=1):
+        """Blocks until n tokens are available, then takes them."""
+        self._refill()
+        if self.tokens < n:
+            self.sleep((n - self.tokens) / self.rate)
+            self._refill()
+        # A short sleep (or clock rounding) can leave us a hair under n; the
+        # small debt is paid back by the next refill.
+        self.tokens -= n
+
+
+class DispatchResult:
+    """Outcome of sending a single email."""
+    __slots__ = ("key", "to", "status", "message_id", "attempts", "error")
+
+    def __init__(self, key, to, status, message_id=None, attempts=0, error=None):
+        self.key = key
+        self.to = to
+        self.status = status  # 'sent' or 'failed'
+        self.message_id = message_id
+        self.attempts = attempts
+        self.error = error
+
+    def to_dict(self):
+        return {
+            "key": self.key,
+            "to": self.to,
+            "status": self.status,
+            "message_id": self.message_id,
+            "attempts": self.attempts,
+            "error": self.error,
+        }
+
+
+def http_status(error):
+    """Extracts the HTTP status from an HttpError (or a fake of one)."""
+    resp = getattr(error, "resp", None)
+    status = getattr(resp, "status", None) or getattr(error, "status_code", None)
+    try:
+        return int(status)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, rng, base=BASE_DELAY, cap=MAX_DELAY):
+    """Exponential backoff with jitter for the given (1-based) attempt."""
+    delay = min(cap, base * (2 ** (attempt - 1)))
+    return delay * (0.5 + rng.random() / 2)
+
+
+def dispatch_messages(service, jobs, batch_size=BATCH_SIZE, rate=SEND_RATE, burst=SEND_BURST,
+                      max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY,
+                      clock=time.monotonic, sleep=time.sleep, rng=None):
+    """
+    Sends messages and yields a DispatchResult for each one as it completes.
+
+    `jobs` is an iterable of (key, to, body) tuples, where body is the dict
+    passed to messages().send(). It is consumed lazily, one batch at a time,
+    so it can be a generator over a very large file.
+    """
+    rng = rng or random.Random()
+    bucket = TokenBucket(rate, burst, clock=clock, sleep=sleep)
+    pending = iter(jobs)
+    retries = []  # heap of (ready_at, seq, attempts, job)
+    seq = itertools.count()
+    exhausted = False
+
+    while True:
+        batch = []
+        now = clock() + 1e-6  # tolerate clock rounding after sleeping to ready_at
+        while retries and retries[0][0] <= now and len(batch) < batch_size:
+            _, _, attempts, job = heapq.heappop(retries)
+            batch.append((job, attempts))
+        if not exhausted and len(batch) < batch_size:
+            fresh = list(itertools.islice(pending, batch_size - len(batch)))
+            exhausted = len(fresh) < batch_size - len(batch)
+            batch.extend((job, 0) for job in fresh)
+
+        if not batch:
+            if not retries:
+                return
+            sleep(max(0.0, retries[0][0] - clock()))
+            continue
+
+        outcomes = _send_batch(service, batch, bucket)
+        for (job, attempts), (response, error) in zip(batch, outcomes):
+            key, to, _ = job
+            attempts += 1
+            if error is None:
+                yield DispatchResult(key, to, "sent", response.get("id"), attempts)
+            elif http_status(error) in RETRYABLE_STATUSES and attempts < max_attempts:
+                ready_at = clock() + backoff_delay(attempts, rng, base_delay)
+                heapq.heappush(retries, (ready_at, next(seq), attempts, job))
+            else:
+                yield DispatchResult(key, to, "failed", attempts=attempts, error=str(error))
+
+
+def _send_batch(service, batch, bucket):
+    """Sends one batch; returns (response, error) per entry, in order."""
+    outcomes = [(None, None)] * len(batch)
+
+    def callback(request_id, response, exception):
+        outcomes[int(request_id)] = (response, exception)
+
+    http_batch = service.new_batch_http_request(callback=callback)
+    for i, ((_, _, body), _) in enumerate(batch):
+        bucket.acquire()
+        http_batch.add(service.users().messages().send(userId="me", body=body), request_id=str(i))
+
+    try:
+        http_batch.execute()
+        error = _TransientError("no response for this part of the batch")
+    except TRANSPORT_ERRORS as exc:
+        # The whole round trip failed on the network
+        error = _TransientError(exc)
+    except Exception as exc:
+        # An HTTP error for the batch endpoint itself (e.g. a 5xx) applies to
+        # every part; anything else is a bug and must not be retried
+        if http_status(exc) is None:
+            raise
+        error = exc
+
+    # Anything that didn't get an answer is retried like a 503
+    for i, (response, exc) in enumerate(outcomes):
+        if response is None and exc is None:
+            outcomes[i] = (None, error)
+    return outcomes
+
+
+class _TransientError(Exception):
+    """Wraps a connection-level failure so it is retried like a 503."""
+    status_code = 503
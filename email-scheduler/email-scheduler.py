@@ -1,30 +1,36 @@
 import json
-import base64
-from datetime import datetime, timezone
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import itertools
 import os.path
+import sys
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+
+from email_loader import iter_email_records, parse_datetime, validate_email_file, validate_records
+from mail_merge import encode_messages, load_campaign, pool_size_for
+from send_queue import SendQueue, idempotency_key, message_id_for, run_dispatcher
+from service_cache import account_key, build_gmail_service, get_sender_email, needs_refresh
+
+# The shared profiling hooks live in the py-assist root
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import profiling
 
 # Gmail API scopes
 SCOPES = ['https://www.googleapis.com/auth/gmail.send', 'https://www.googleapis.com/auth/gmail.readonly']
 
 def authenticate_gmail():
-    """Authenticate and return Gmail service object"""
+    """Authenticate and return the Gmail service object and its credentials"""
     creds = None
     
     # Load existing token
     if os.path.exists('token.json'):
         creds = Credentials.from_authorized_user_file('token.json', SCOPES)
     
-    # If there are no valid credentials, get new ones
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
+    # Only go to the network for a token when ours is missing or about to
+    # expire; a still-valid token.json is used (and left) as it is
+    if not creds or needs_refresh(creds):
+        if creds and creds.refresh_token:
             creds.refresh(Request())
         else:
             # You need to download credentials.json from Google Cloud Console
@@ -35,96 +41,24 @@ def authenticate_gmail():
         with open('token.json', 'w') as token:
             token.write(creds.to_json())
     
-    return build('gmail', 'v1', credentials=creds)
+    # Cached discovery document, one shared connection pool for all requests
+    return build_gmail_service(creds), creds
 
-def create_message(to, subject, body, sender_email):
-    """Create email message"""
-    message = MIMEMultipart()
-    message['to'] = to
-    message['subject'] = subject
-    message['from'] = sender_email
+def iter_queue_rows(records, sender_email, processes=0):
+    """Build (key, send_at, recipient, body) send-queue rows for (index, email) pairs"""
+    keyed, to_encode = itertools.tee(
+        (idempotency_key(email_data), email_data) for _, email_data in records
+    )
     
-    message.attach(MIMEText(body, 'plain'))
+    # The Message-ID lets us check Gmail for this email after a crash
+    parts = (
+        (email_data['to'], email_data['subject'], email_data['body'], message_id_for(key))
+        for key, email_data in to_encode
+    )
     
-    # Encode message
-    raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
-    return {'raw': raw_message}
-
-def parse_datetime(datetime_str):
-    """Parse datetime string to timestamp"""
-    try:
-        # Try parsing format: "2025-08-15 14:30"
-        dt = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M")
-        # Convert to UTC timestamp in milliseconds
-        return int(dt.replace(tzinfo=timezone.utc).timestamp() * 1000)
-    except ValueError:
-        try:
-            # Try parsing format: "2025-08-15 14:30:00"
-            dt = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S")
-            return int(dt.replace(tzinfo=timezone.utc).timestamp() * 1000)
-        except ValueError:
-            raise ValueError(f"Invalid datetime format: {datetime_str}. Use 'YYYY-MM-DD HH:MM' or 'YYYY-MM-DD HH:MM:SS'")
-
-def schedule_email(service, email_data, sender_email):
-    """Schedule an email using Gmail API"""
-    try:
-        # Create the email message
-        message = create_message(
-            email_data['to'], 
-            email_data['subject'], 
-            email_data['body'],
-            sender_email
-        )
-        
-        # Parse the scheduled send time
-        scheduled_time = parse_datetime(email_data['send_time'])
-        
-        # Add scheduling information
-        message['scheduleTime'] = scheduled_time
-        
-        # Send the scheduled message
-        result = service.users().messages().send(
-            userId='me', 
-            body=message
-        ).execute()
-        
-        print(f"✅ Email scheduled successfully!")
-        print(f"   To: {email_data['to']}")
-        print(f"   Subject: {email_data['subject']}")
-        print(f"   Scheduled for: {email_data['send_time']}")
-        print(f"   Message ID: {result['id']}")
-        return result
-        
-    except HttpError as error:
-        print(f"❌ An error occurred: {error}")
-        return None
-    except Exception as error:
-        print(f"❌ Error: {error}")
-        return None
-
-def load_emails_from_file(filename):
-    """Load email data from JSON file"""
-    try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            
-        # Handle both single email and multiple emails
-        if isinstance(data, dict):
-            return [data]  # Single email
-        elif isinstance(data, list):
-            return data    # Multiple emails
-        else:
-            raise ValueError("JSON file must contain either a single email object or an array of email objects")
-            
-    except FileNotFoundError:
-        print(f"❌ File '{filename}' not found!")
-        return []
-    except json.JSONDecodeError as e:
-        print(f"❌ Invalid JSON format: {e}")
-        return []
-    except Exception as e:
-        print(f"❌ Error reading file: {e}")
-        return []
+    # Gmail sends immediately, so the send time is kept by our own queue
+    for (key, email_data), message in zip(keyed, encode_messages(sender_email, parts, processes)):
+        yield key, parse_datetime(email_data['send_time']), email_data['to'], message
 
 def main():
     """Main function to schedule emails"""
@@ -132,56 +66,97 @@ def main():
     print("=" * 40)
     
     # Get email file path
-    email_file = input("Enter the path to your email JSON file (default: 'emails.json'): ").strip()
+    email_file = input("Enter the path to your email JSON file or campaign file (default: 'emails.json'): ").strip()
     if not email_file:
         email_file = 'emails.json'
     
-    # Load emails from file
-    emails = load_emails_from_file(email_file)
+    # Check the whole file (or every rendered campaign email) before sending anything
+    try:
+        with profiling.operation('validate'):
+            campaign = load_campaign(email_file)
+            if campaign:
+                print(f"📝 Mail merge: rendering templates with rows from {campaign.data_file}")
+                records = campaign.records
+                count, errors = validate_records(records())
+            else:
+                records = lambda: iter_email_records(email_file)
+                count, errors = validate_email_file(email_file)
+    except FileNotFoundError as e:
+        print(f"❌ File '{e.filename or email_file}' not found!")
+        return
+    except OSError as e:
+        print(f"❌ Error reading file: {e}")
+        return
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    
+    if errors:
+        print(f"❌ Found {len(errors)} problem(s) in {email_file}:")
+        for index, message in errors:
+            print(f"   Email {index}: {message}")
+        print("Fix these and run again. Nothing was sent.")
+        return
     
-    if not emails:
+    if not count:
         print("No emails to process. Exiting.")
         return
+    profiling.snapshot('validated')
     
     try:
         # Authenticate Gmail
         print("\n🔐 Authenticating with Gmail...")
-        service = authenticate_gmail()
+        with profiling.operation('authenticate'):
+            service, creds = authenticate_gmail()
         
-        # Get sender email (your Gmail address) - alternative method
+        # Get sender email (your Gmail address), cached between runs
         try:
-            profile = service.users().getProfile(userId='me').execute()
-            sender_email = profile['emailAddress']
+            sender_email = get_sender_email(service, account_key(creds))
         except:
             # Fallback: ask user for their email address
             sender_email = input("Enter your Gmail address: ").strip()
         
         print(f"✅ Authenticated as: {sender_email}")
         
-        # Schedule each email
-        print(f"\n📧 Processing {len(emails)} email(s)...")
-        successful = 0
+        # Stream the file a second time into the local send queue. Emails
+        # that are already queued (same idempotency key) are skipped.
+        queue = SendQueue()
+        # Large campaigns are MIME-encoded in a process pool
+        with profiling.operation('enqueue'):
+            added = queue.enqueue_many(iter_queue_rows(records(), sender_email, pool_size_for(count)))
+        profiling.snapshot('queued')
+        print(f"\n📥 Queued {added} new or previously failed email(s) ({count - added} were already queued)")
+        print("⏳ Emails are sent when their send_time (this computer's local time) comes due. Keep this window open;")
+        print("   Ctrl+C stops sending, and anything still queued is sent on the next run.")
+        
+        def on_wait(seconds):
+            print(f"💤 Next email due in {seconds / 60:.1f} minute(s)...")
         
-        for i, email_data in enumerate(emails, 1):
-            print(f"\n--- Email {i}/{len(emails)} ---")
-            
-            # Validate required fields
-            required_fields = ['to', 'subject', 'body', 'send_time']
-            missing_fields = [field for field in required_fields if field not in email_data]
-            
-            if missing_fields:
-                print(f"❌ Missing required fields: {', '.join(missing_fields)}")
-                continue
-            
-            # Schedule the email
-            result = schedule_email(service, email_data, sender_email)
-            if result:
-                successful += 1
+        # Send due emails in rate-limited batches, retrying 429/5xx with
+        # backoff, and write the per-email report as results come in
+        successful = failed = 0
+        report_file = email_file + '.report.jsonl'
+        try:
+            with open(report_file, 'a', encoding='utf-8') as report:
+                results = run_dispatcher(queue, service, on_wait=on_wait)
+                for result in profiling.profiled_iter('dispatch', results):
+                    report.write(json.dumps(result.to_dict()) + '\n')
+                    report.flush()
+                    if result.status == 'sent':
+                        successful += 1
+                        print(f"✅ Email to {result.to} sent (Message ID: {result.message_id})")
+                    else:
+                        failed += 1
+                        print(f"❌ Email to {result.to} failed after {result.attempts} attempt(s): {result.error}")
+        except KeyboardInterrupt:
+            print("\n🛑 Stopped. Unsent emails stay in the queue for the next run.")
         
-        print(f"\n✅ Successfully scheduled {successful} out of {len(emails)} emails!")
+        print(f"\n✅ Sent {successful} email(s), {failed} failed. Queue: {queue.counts()}")
+        print(f"📄 Per-email report written to {report_file}")
         
     except Exception as error:
         print(f"❌ Fatal error: {error}")
 
 if __name__ == '__main__':
+    profiling.install('email-scheduler')
     main()
\ No newline at end of file
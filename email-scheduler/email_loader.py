@@ -0,0 +1,233 @@
+"""
+Streaming loader and validator for email files.
+
+Accepts the same files as before (a single email object or an array of
+them) plus JSON-lines files, and yields one record at a time so memory
+stays flat no matter how many emails a file holds. validate_email_file()
+makes a quick pass over the whole file before anything is sent and
+reports every bad record with its index.
+"""
+
+import functools
+import json
+import re
+from datetime import datetime
+from email.utils import getaddresses
+
+# --- Configuration ---
+REQUIRED_FIELDS = ('to', 'subject', 'body', 'send_time')
+HEADER_FIELDS = ('to', 'subject')
+JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson')
+# send_time formats, e.g. "2025-08-15 14:30" and "2025-08-15 14:30:00+08:00"
+DATETIME_FORMATS = ('%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M%z', '%Y-%m-%d %H:%M:%S%z')
+CHUNK_SIZE = 64 * 1024
+# A value cut off by the end of a chunk fails to decode within this many
+# characters of the end (e.g. '"\\u12', 'tru', '1.')
+CUT_OFF_MARGIN = 16
+
+WHITESPACE = re.compile(r'[ \t\r\n]*')
+
+
+class EmailFileError(ValueError):
+    """The file itself can't be parsed any further."""
+
+    def __init__(self, message, index=None):
+        super().__init__(message)
+        self.index = index
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_datetime(datetime_str):
+    """
+    Parse datetime string to timestamp. A time without a UTC offset is
+    local time on this computer, like the clock the user read it from;
+    '2025-08-15 14:30+08:00' pins it to a zone.
+    """
+    # Mail-merge files repeat the same few send times, hence the cache
+    for fmt in DATETIME_FORMATS:
+        try:
+            dt = datetime.strptime(datetime_str, fmt)
+        except ValueError:
+            continue
+        # A naive datetime's timestamp() is taken in the local zone
+        return int(dt.timestamp() * 1000)
+    raise ValueError(f"Invalid datetime format: {datetime_str}. Use 'YYYY-MM-DD HH:MM' or 'YYYY-MM-DD HH:MM:SS' "
+                     "(local time), optionally followed by a UTC offset such as '+08:00'")
+
+
+def validate_record(record):
+    """Returns a list of problems with one email record (empty if it's fine)."""
+    if not isinstance(record, dict):
+        return [f"expected an email object, got {type(record).__name__}"]
+
+    problems = []
+    missing_fields = [field for field in REQUIRED_FIELDS if field not in record]
+    if missing_fields:
+        problems.append(f"Missing required fields: {', '.join(missing_fields)}")
+    send_time = record.get('send_time')
+    if send_time is not None:
+        try:
+            parse_datetime(str(send_time))
+        except ValueError as e:
+            problems.append(str(e))
+    for field in HEADER_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str) and ('\r' in value or '\n' in value):
+            problems.append(f"'{field}' must not contain line breaks")
+    to = record.get('to')
+    if isinstance(to, str) and not all(address.isascii() for _, address in getaddresses([to])):
+        problems.append("'to' addresses must be ASCII (only display names may use other characters)")
+    return problems
+
+
+def iter_email_records(filename, errors=None):
+    """
+    Yields (index, record) for every email in the file, index starting at 1.
+
+    JSON-lines files (.jsonl/.ndjson) are read line by line; a line that
+    isn't valid JSON is appended to `errors` as (index, message) when a list
+    is given, otherwise it raises EmailFileError. Other files may hold a
+    single object, an array of objects, or whitespace-separated objects;
+    they are decoded incrementally and a syntax error always raises.
+    """
+    if filename.lower().endswith(JSON_LINES_EXTENSIONS):
+        yield from _iter_json_lines(filename, errors)
+    else:
+        yield from _iter_json_stream(filename)
+
+
+def _iter_json_lines(filename, errors):
+    with open(filename, 'r', encoding='utf-8') as file:
+        index = 0
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            index += 1
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                message = f"Invalid JSON on line {line_number}: {e.msg}"
+                if errors is None:
+                    raise EmailFileError(message, index)
+                errors.append((index, message))
+                continue
+            yield index, record
+
+
+class _Reader:
+    """A sliding text window over a file for incremental decoding."""
+
+    def __init__(self, file):
+        self.file = file
+        self.buf = ''
+        self.pos = 0
+        self.offset = 0  # characters dropped from the front of buf
+        self.eof = False
+
+    def fill(self):
+        """Reads another chunk; returns False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.file.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > CHUNK_SIZE:
+            self.offset += self.pos
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += chunk
+        return True
+
+    def skip_whitespace(self):
+        """Moves past whitespace; returns the next character or '' at EOF."""
+        while True:
+            self.pos = WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def decode(self, decoder, index):
+        """Decodes the next value, reading more of the file as needed."""
+        self.skip_whitespace()  # raw_decode doesn't skip leading whitespace
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+                # A value that runs to the very end of the buffer may have
+                # been cut off (e.g. a number); make sure by reading on.
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof or not self._may_be_cut_off(e):
+                    raise EmailFileError(
+                        f"Invalid JSON format in email {index} (character {self.offset + e.pos}): {e.msg}",
+                        index,
+                    )
+            self.fill()
+
+    def _may_be_cut_off(self, error):
+        """
+        Whether reading more could fix a decode error: only if it is at the
+        end of what we have (or is a string that runs to the end). A real
+        syntax error further back raises right away instead of pulling the
+        rest of the file into memory.
+        """
+        if error.msg.startswith('Unterminated string'):
+            return True  # reported at the opening quote
+        return error.pos >= len(self.buf) - CUT_OFF_MARGIN
+
+
+def _iter_json_stream(filename):
+    decoder = json.JSONDecoder()
+    with open(filename, 'r', encoding='utf-8') as file:
+        reader = _Reader(file)
+        first = reader.skip_whitespace()
+        index = 0
+
+        if first != '[':
+            # One object, or several separated by whitespace
+            while reader.skip_whitespace():
+                index += 1
+                yield index, reader.decode(decoder, index)
+            return
+
+        reader.pos += 1  # consume '['
+        if reader.skip_whitespace() == ']':
+            return
+        while True:
+            index += 1
+            yield index, reader.decode(decoder, index)
+            separator = reader.skip_whitespace()
+            if separator == ']':
+                return
+            if separator != ',':
+                raise EmailFileError(f"Expected ',' or ']' after email {index}", index)
+            reader.pos += 1
+
+
+def validate_records(records, errors=None):
+    """
+    Checks every (index, record) pair without sending anything.
+
+    Returns (count, errors) where errors is a list of (index, message) for
+    every bad record. A source that can't be parsed past some point reports
+    that as its last error.
+    """
+    errors = [] if errors is None else errors
+    count = 0
+    try:
+        for index, record in records:
+            count = index
+            for problem in validate_record(record):
+                errors.append((index, problem))
+    except EmailFileError as e:
+        errors.append((e.index, str(e)))
+    return count, errors
+
+
+def validate_email_file(filename):
+    """Checks every record in an email file; see validate_records()."""
+    errors = []
+    return validate_records(iter_email_records(filename, errors), errors)
@@ -0,0 +1,160 @@
+"""
+A local stand-in for the Gmail API service object.
+
+Implements just the calls the email scheduler makes, with configurable
+latency per HTTP round trip and randomly injected HTTP errors, so the send
+pipeline can be tested and benchmarked without network access or an
+account.
+
+    service = FakeGmailService(latency=0.05, error_rate=0.1)
+"""
+
+import base64
+import itertools
+import random
+import threading
+import time
+from email.parser import BytesHeaderParser
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.reason = "Injected error"
+
+
+class FakeHttpError(Exception):
+    """Looks enough like googleapiclient.errors.HttpError for our code."""
+
+    def __init__(self, status):
+        super().__init__(f"HTTP {status} (injected)")
+        self.resp = FakeResponse(status)
+        self.status_code = status
+
+
+class _Request:
+    def __init__(self, service, method, kwargs):
+        self.service = service
+        self.method = method
+        self.kwargs = kwargs
+
+    def execute(self, http=None):
+        self.service._round_trip()
+        return self.service._call(self.method, self.kwargs)
+
+
+class _Batch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, callback=None, request_id=None):
+        if len(self.requests) >= self.service.MAX_BATCH_SIZE:
+            raise ValueError(f"Exceeded the maximum of {self.service.MAX_BATCH_SIZE} calls in a batch")
+        if request_id is None:
+            request_id = str(len(self.requests))
+        self.requests.append((request_id, request, callback))
+
+    def execute(self, http=None):
+        # One round trip for the whole batch, then per-part results.
+        self.service._round_trip()
+        self.service.batches += 1
+        for request_id, request, callback in self.requests:
+            try:
+                response, exception = self.service._call(request.method, request.kwargs), None
+            except FakeHttpError as e:
+                response, exception = None, e
+            (callback or self.callback)(request_id, response, exception)
+
+
+class _Messages:
+    def __init__(self, service):
+        self.service = service
+
+    def send(self, userId, body):
+        return _Request(self.service, "send", {"userId": userId, "body": body})
+
+    def list(self, userId, q=None, maxResults=None):
+        return _Request(self.service, "list", {"userId": userId, "q": q})
+
+
+class _Users:
+    def __init__(self, service):
+        self.service = service
+
+    def messages(self):
+        return _Messages(self.service)
+
+    def getProfile(self, userId):
+        return _Request(self.service, "getProfile", {"userId": userId})
+
+
+class FakeGmailService:
+    """In-memory Gmail service with injectable latency and failures."""
+
+    MAX_BATCH_SIZE = 100
+
+    def __init__(self, latency=0.0, error_rate=0.0, error_statuses=(429, 503),
+                 email_address="me@example.com", seed=None, sleep=time.sleep):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.email_address = email_address
+        self.rng = random.Random(seed)
+        self.sleep = sleep
+        self.sent = []          # bodies that were accepted, in order
+        self.by_message_id = {} # Message-ID header -> Gmail id, for rfc822msgid: searches
+        self.round_trips = 0
+        self.batches = 0
+        self.errors = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def users(self):
+        return _Users(self)
+
+    def new_batch_http_request(self, callback=None):
+        return _Batch(self, callback)
+
+    def _round_trip(self):
+        with self._lock:
+            self.round_trips += 1
+        if self.latency:
+            self.sleep(self.latency)
+
+    def _call(self, method, kwargs):
+        with self._lock:
+            if method == "getProfile":
+                return {"emailAddress": self.email_address}
+            if method == "list":
+                return self._search(kwargs.get("q") or "")
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.errors += 1
+                raise FakeHttpError(self.rng.choice(self.error_statuses))
+            message_id = f"fake{next(self._ids):08x}"
+            body = kwargs["body"]
+            self.sent.append(body)
+            header = self._message_id_header(body)
+            if header:
+                self.by_message_id[header.strip("<>")] = message_id
+            return {"id": message_id, "threadId": message_id, "labelIds": ["SENT"]}
+
+    def _search(self, q):
+        # Only the rfc822msgid: operator is supported
+        if q.startswith("rfc822msgid:"):
+            found = self.by_message_id.get(q[len("rfc822msgid:"):].strip("<>"))
+            if found:
+                return {"messages": [{"id": found, "threadId": found}], "resultSizeEstimate": 1}
+        return {"resultSizeEstimate": 0}
+
+    @staticmethod
+    def _message_id_header(body):
+        raw = body.get("raw") if isinstance(body, dict) else None
+        if not raw:
+            return None
+        try:
+            headers = BytesHeaderParser().parsebytes(base64.urlsafe_b64decode(raw))
+        except (ValueError, TypeError):
+            return None
+        return headers.get("Message-ID")
@@ -0,0 +1,227 @@
+"""
+Mail merge for the email scheduler.
+
+A campaign file is a JSON object holding string.Template-style templates
+($name or ${name}) for each email field plus the path of a CSV or
+JSON-lines data file, one recipient per row:
+
+    {
+      "template": {
+        "to": "$email",
+        "subject": "Hi $first_name",
+        "body": "Hello $first_name,\\n...",
+        "send_time": "2025-08-15 14:30"
+      },
+      "data": "recipients.csv"
+    }
+
+Templates are compiled once into literal/field parts, so rendering a row
+is a single join. MessageEncoder builds the raw RFC 5322 message for a
+fixed sender from prebuilt header bytes instead of assembling a
+MIMEMultipart per email, and encode_messages() spreads the encoding over
+a process pool for large campaigns.
+"""
+
+import base64
+import concurrent.futures
+import csv
+import itertools
+import os
+import re
+from email.header import Header
+from email.utils import formataddr, getaddresses
+
+from email_loader import EmailFileError, iter_email_records
+
+# --- Configuration ---
+# Below this many messages a process pool costs more than it saves
+POOL_THRESHOLD = 2000
+POOL_CHUNK_SIZE = 500
+
+_FIELD = re.compile(r'\$(?:(\$)|([_a-zA-Z][_a-zA-Z0-9]*)|\{([_a-zA-Z][_a-zA-Z0-9]*)\})')
+
+
+class CompiledTemplate:
+    """A string.Template-compatible template split into parts once."""
+    __slots__ = ('source', 'parts', 'fields')
+
+    def __init__(self, source):
+        self.source = source
+        parts = []   # literal strings, and field names as 1-tuples
+        literal = []
+        pos = 0
+        for match in _FIELD.finditer(source):
+            literal.append(source[pos:match.start()])
+            pos = match.end()
+            if match.group(1):
+                literal.append('$')
+                continue
+            parts.append(''.join(literal))
+            literal = []
+            parts.append((match.group(2) or match.group(3),))
+        literal.append(source[pos:])
+        parts.append(''.join(literal))
+        self.parts = [p for p in parts if p != '']
+        self.fields = {p[0] for p in self.parts if isinstance(p, tuple)}
+
+    def render(self, row):
+        try:
+            return ''.join(row[p[0]] if isinstance(p, tuple) else p for p in self.parts)
+        except KeyError as e:
+            raise KeyError(f"data row has no column {e.args[0]!r}") from None
+
+
+class Campaign:
+    """Compiled templates for every email field."""
+
+    FIELDS = ('to', 'subject', 'body', 'send_time')
+
+    def __init__(self, template, data_file):
+        self.templates = {field: CompiledTemplate(str(template.get(field, ''))) for field in self.FIELDS}
+        self.data_file = data_file
+
+    @classmethod
+    def from_spec(cls, spec, base_dir='.'):
+        return cls(spec['template'], os.path.join(base_dir, spec['data']))
+
+    def render(self, row):
+        return {field: template.render(row) for field, template in self.templates.items()}
+
+    def records(self):
+        """Yields (index, email record) for every data row, index starting at 1."""
+        for index, row in iter_rows(self.data_file):
+            try:
+                yield index, self.render(row)
+            except KeyError as e:
+                raise EmailFileError(f"Row {index}: {e.args[0]}", index)
+
+
+def is_campaign(record):
+    return isinstance(record, dict) and 'template' in record and 'data' in record
+
+
+def load_campaign(filename):
+    """Returns a Campaign if the file is a campaign spec, otherwise None."""
+    for _, record in iter_email_records(filename):
+        if is_campaign(record):
+            return Campaign.from_spec(record, os.path.dirname(os.path.abspath(filename)))
+        return None
+    return None
+
+
+def iter_rows(filename):
+    """Yields (index, row dict) from a CSV (with header) or JSON-lines file."""
+    if filename.lower().endswith('.csv'):
+        with open(filename, 'r', encoding='utf-8', newline='') as file:
+            for index, row in enumerate(csv.DictReader(file, restval=''), 1):
+                yield index, row
+    else:
+        for index, row in iter_email_records(filename):
+            yield index, {key: str(value) for key, value in row.items()}
+
+
+# --- Message encoding ---
+
+def _header_value(name, value):
+    if '\r' in value or '\n' in value:
+        raise ValueError(f"{name} header must not contain line breaks")
+    if value.isascii():
+        return value
+    return Header(value, 'utf-8').encode(linesep='\r\n')
+
+
+def _address_value(name, value):
+    # Only display names may be encoded; the addresses themselves stay ASCII
+    if value.isascii():
+        return _header_value(name, value)
+    _header_value(name, value)
+    try:
+        return ', '.join(formataddr(pair, charset='utf-8') for pair in getaddresses([value]))
+    except UnicodeEncodeError:
+        raise ValueError(f"{name} addresses must be ASCII") from None
+
+
+class MessageEncoder:
+    """Builds raw messages for one sender from prebuilt header bytes."""
+
+    def __init__(self, sender_email):
+        sender = _address_value('From', sender_email).encode('ascii')
+        common = b'MIME-Version: 1.0\r\nFrom: ' + sender + b'\r\n'
+        # Plain ASCII bodies go out as-is; anything else is base64 UTF-8
+        self._ascii_headers = (
+            common + b'Content-Type: text/plain; charset="us-ascii"\r\n'
+            b'Content-Transfer-Encoding: 7bit\r\n'
+        )
+        self._utf8_headers = (
+            common + b'Content-Type: text/plain; charset="utf-8"\r\n'
+            b'Content-Transfer-Encoding: base64\r\n'
+        )
+
+    def encode(self, to, subject, body, message_id=None):
+        """Returns the messages().send() body for one email."""
+        headers = [
+            b'To: ', _address_value('To', to).encode('ascii'), b'\r\n',
+            b'Subject: ', _header_value('Subject', subject).encode('ascii'), b'\r\n',
+        ]
+        if message_id:
+            headers += [b'Message-ID: ', message_id.encode('ascii'), b'\r\n']
+
+        # CRLF line endings, including for stray bare CRs
+        body = body.replace('\r\n', '\n').replace('\r', '\n').replace('\n', '\r\n')
+        if body.isascii() and all(len(line) <= 998 for line in body.split('\r\n')):
+            payload = body.encode('ascii')
+            headers.append(self._ascii_headers)
+        else:
+            payload = base64.encodebytes(body.encode('utf-8')).replace(b'\n', b'\r\n')
+            headers.append(self._utf8_headers)
+
+        raw = b''.join(headers) + b'\r\n' + payload
+        return {'raw': base64.urlsafe_b64encode(raw).decode('ascii')}
+
+
+_worker_encoder = None
+
+
+def _init_worker(sender_email):
+    global _worker_encoder
+    _worker_encoder = MessageEncoder(sender_email)
+
+
+def _encode_chunk(chunk):
+    return [_worker_encoder.encode(*item) for item in chunk]
+
+
+def encode_messages(sender_email, items, processes=None, chunksize=POOL_CHUNK_SIZE):
+    """
+    Yields a send body for each (to, subject, body, message_id) item, in order.
+
+    With processes > 1 the items are encoded in a process pool, a bounded
+    number of chunks ahead of the consumer; otherwise in this process.
+    """
+    if not processes or processes <= 1:
+        encoder = MessageEncoder(sender_email)
+        for item in items:
+            yield encoder.encode(*item)
+        return
+
+    items = iter(items)
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker, initargs=(sender_email,)
+    ) as pool:
+        in_flight = []
+        while True:
+            while len(in_flight) < processes * 2:
+                chunk = list(itertools.islice(items, chunksize))
+                if not chunk:
+                    break
+                in_flight.append(pool.submit(_encode_chunk, chunk))
+            if not in_flight:
+                return
+            yield from in_flight.pop(0).result()
+
+
+def pool_size_for(count):
+    """How many processes to encode `count` messages with (0 means in-process)."""
+    if count < POOL_THRESHOLD:
+        return 0
+    return os.cpu_count() or 1
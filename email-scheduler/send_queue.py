@@ -0,0 +1,228 @@
+"""
+Durable local send queue for timed emails.
+
+Gmail's messages.send() ignores any schedule field and sends right away,
+so scheduling happens here: emails are stored in SQLite, indexed by send
+time, and a dispatcher sleeps until the next one is due and sends
+everything due in batches through dispatch.dispatch_messages().
+
+Every email carries an idempotency key. It is unique in the queue, so
+re-enqueueing the same file is a no-op, except that emails which failed
+are put back in the queue. The key (hashed, unless it is a plain token)
+also becomes the message's Message-ID header. When the dispatcher starts, any row left in
+'sending' by a crash is looked up in the mailbox by that Message-ID
+(rfc822msgid: search). It is only re-sent if Gmail never got it.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+from dispatch import BATCH_SIZE, dispatch_messages
+
+# --- Configuration ---
+# Next to the scheduler rather than in the working directory, so every run
+# sees the same queue (and the same idempotency keys)
+QUEUE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'send_queue.db')
+MESSAGE_ID_DOMAIN = 'py-assist.local'
+# Keys that can go into a Message-ID as they are; anything else is hashed
+MESSAGE_ID_SAFE_KEY = re.compile(r'[A-Za-z0-9_-]{1,64}\Z')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue (
+    id INTEGER PRIMARY KEY,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    send_at INTEGER NOT NULL,               -- epoch milliseconds, UTC
+    recipient TEXT NOT NULL,
+    body TEXT NOT NULL,                     -- JSON body for messages().send()
+    status TEXT NOT NULL DEFAULT 'pending', -- pending, sending, sent, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    message_id TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS queue_status_send_at ON queue (status, send_at);
+"""
+
+
+def idempotency_key(email_data):
+    """A stable key for an email: its own 'id' field, or a hash of its content."""
+    if email_data.get('id'):
+        return str(email_data['id'])
+    content = '\x1f'.join(str(email_data.get(field, '')) for field in ('to', 'subject', 'body', 'send_time'))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]
+
+
+def message_id_for(key):
+    """
+    The Message-ID header used to find a message again after a crash.
+    A user-supplied id may hold anything (line breaks, non-ASCII, '>'), so
+    unless it is a plain token, its hash is used instead.
+    """
+    if not MESSAGE_ID_SAFE_KEY.match(key):
+        key = hashlib.sha256(key.encode('utf-8', 'surrogatepass')).hexdigest()[:32]
+    return f"<{key}@{MESSAGE_ID_DOMAIN}>"
+
+
+class QueuedEmail:
+    __slots__ = ('id', 'key', 'send_at', 'recipient', 'body')
+
+    def __init__(self, row_id, key, send_at, recipient, body):
+        self.id = row_id
+        self.key = key
+        self.send_at = send_at
+        self.recipient = recipient
+        self.body = body
+
+
+class SendQueue:
+    """SQLite-backed queue of emails ordered by send time."""
+
+    def __init__(self, path=QUEUE_FILE):
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def enqueue_many(self, rows):
+        """
+        Adds (key, send_at_ms, recipient, body) rows in one transaction.
+        Rows whose key is already queued are ignored, unless that email
+        failed: then it is queued again with the new values. Returns how
+        many were added or requeued.
+        """
+        before = self.conn.total_changes
+        with self._transaction():
+            self.conn.executemany(
+                'INSERT INTO queue (idempotency_key, send_at, recipient, body) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (idempotency_key) DO UPDATE SET '
+                "status = 'pending', send_at = excluded.send_at, recipient = excluded.recipient, "
+                'body = excluded.body, attempts = 0, message_id = NULL, error = NULL '
+                "WHERE status = 'failed'",
+                ((key, send_at, recipient, json.dumps(body)) for key, send_at, recipient, body in rows),
+            )
+        return self.conn.total_changes - before
+
+    def enqueue(self, key, send_at, recipient, body):
+        return self.enqueue_many([(key, send_at, recipient, body)])
+
+    def next_due_at(self):
+        """send_at of the earliest pending email, or None."""
+        row = self.conn.execute(
+            "SELECT send_at FROM queue WHERE status = 'pending' ORDER BY send_at LIMIT 1"
+        ).fetchone()
+        return row[0] if row else None
+
+    def claim_due(self, now_ms, limit=BATCH_SIZE):
+        """Marks up to `limit` due emails as 'sending' and returns them."""
+        with self._transaction():
+            rows = self.conn.execute(
+                "SELECT id, idempotency_key, send_at, recipient, body FROM queue "
+                "WHERE status = 'pending' AND send_at <= ? ORDER BY send_at LIMIT ?",
+                (now_ms, limit),
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE queue SET status = 'sending', attempts = attempts + 1 WHERE id = ?",
+                ((row[0],) for row in rows),
+            )
+        return [QueuedEmail(r[0], r[1], r[2], r[3], json.loads(r[4])) for r in rows]
+
+    def mark_sent(self, row_id, message_id):
+        self.conn.execute(
+            "UPDATE queue SET status = 'sent', message_id = ?, error = NULL WHERE id = ?",
+            (message_id, row_id),
+        )
+
+    def mark_failed(self, row_id, error):
+        self.conn.execute("UPDATE queue SET status = 'failed', error = ? WHERE id = ?", (error, row_id))
+
+    def in_flight(self):
+        """Emails claimed by a dispatcher that never recorded the outcome."""
+        rows = self.conn.execute(
+            "SELECT id, idempotency_key, send_at, recipient, body FROM queue WHERE status = 'sending'"
+        ).fetchall()
+        return [QueuedEmail(r[0], r[1], r[2], r[3], None) for r in rows]
+
+    def release(self, row_id):
+        self.conn.execute("UPDATE queue SET status = 'pending' WHERE id = ?", (row_id,))
+
+    def counts(self):
+        return dict(self.conn.execute('SELECT status, COUNT(*) FROM queue GROUP BY status').fetchall())
+
+    def _transaction(self):
+        return _Transaction(self.conn)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK for an autocommit connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+
+def already_sent(service, key):
+    """Asks Gmail whether a message with this idempotency key was sent."""
+    response = service.users().messages().list(
+        userId='me', q=f'rfc822msgid:{message_id_for(key)[1:-1]}', maxResults=1
+    ).execute()
+    messages = response.get('messages') or []
+    return messages[0]['id'] if messages else None
+
+
+def recover(queue, service):
+    """
+    Resolves emails left 'sending' by a crash: marks them sent if Gmail has
+    them, otherwise puts them back in the queue. Returns (sent, requeued).
+    """
+    sent = requeued = 0
+    for email in queue.in_flight():
+        message_id = already_sent(service, email.key)
+        if message_id:
+            queue.mark_sent(email.id, message_id)
+            sent += 1
+        else:
+            queue.release(email.id)
+            requeued += 1
+    return sent, requeued
+
+
+def run_dispatcher(queue, service, clock=time.time, sleep=time.sleep, batch_size=BATCH_SIZE,
+                   on_wait=None, **dispatch_options):
+    """
+    Sends queued emails as they come due, yielding a DispatchResult for each,
+    and returns once nothing is pending. `clock` returns epoch seconds.
+    `on_wait(seconds)` is called before sleeping until the next due email.
+    """
+    recover(queue, service)
+    while True:
+        now_ms = int(clock() * 1000)
+        due = queue.claim_due(now_ms, batch_size)
+        if not due:
+            next_at = queue.next_due_at()
+            if next_at is None:
+                return
+            wait = max(0.0, (next_at - now_ms) / 1000.0)
+            if on_wait:
+                on_wait(wait)
+            sleep(wait)
+            continue
+
+        jobs = [(email.id, email.recipient, email.body) for email in due]
+        for result in dispatch_messages(service, jobs, batch_size=batch_size,
+                                        clock=clock, sleep=sleep, **dispatch_options):
+            if result.status == 'sent':
+                queue.mark_sent(result.key, result.message_id)
+            else:
+                queue.mark_failed(result.key, result.error)
+            yield result
@@ -0,0 +1,125 @@
+"""
+Fast startup for the email scheduler.
+
+Caches the Gmail discovery document and the sender's profile on disk with
+an expiry, refreshes the OAuth token only when it is close to expiring,
+and builds the service on a single authorised httplib2 connection pool
+so every request (and every batch) reuses the same HTTPS connection.
+"""
+
+import calendar
+import hashlib
+import json
+import os
+import time
+
+# --- Configuration ---
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'py-assist', 'email-scheduler')
+DISCOVERY_TTL = 7 * 24 * 3600
+PROFILE_TTL = 24 * 3600
+# Refresh the access token when it has less than this many seconds left
+TOKEN_REFRESH_MARGIN = 5 * 60
+HTTP_TIMEOUT = 60
+
+DISCOVERY_URL = 'https://gmail.googleapis.com/$discovery/rest?version=v1'
+
+
+def _cache_file(name):
+    return os.path.join(CACHE_DIR, f"{name}.json")
+
+
+def read_cache(name, ttl, clock=time.time):
+    """Returns a cached value, or None if it is missing or older than ttl."""
+    try:
+        with open(_cache_file(name), 'r', encoding='utf-8') as file:
+            entry = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if clock() - entry.get('stored_at', 0) > ttl:
+        return None
+    return entry.get('value')
+
+
+def write_cache(name, value, clock=time.time):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_file = _cache_file(name) + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as file:
+        json.dump({'stored_at': clock(), 'value': value}, file)
+    os.replace(tmp_file, _cache_file(name))
+
+
+def cached(name, ttl, compute, clock=time.time):
+    """Returns the cached value for name, computing and storing it when stale."""
+    value = read_cache(name, ttl, clock)
+    if value is None:
+        value = compute()
+        try:
+            write_cache(name, value, clock)
+        except OSError as e:
+            print(f"Warning: Could not write cache '{name}': {e}")
+    return value
+
+
+# --- Discovery document ---
+
+def fetch_discovery_document():
+    """Gets the Gmail v1 discovery document, preferring the copy bundled with the client."""
+    try:
+        from googleapiclient.discovery_cache import get_static_doc
+        doc = get_static_doc('gmail', 'v1')
+        if doc:
+            return doc
+    except ImportError:
+        pass
+    import httplib2
+    response, content = httplib2.Http(timeout=HTTP_TIMEOUT).request(DISCOVERY_URL)
+    if response.status != 200:
+        raise RuntimeError(f"Could not fetch the Gmail discovery document (HTTP {response.status})")
+    return content.decode('utf-8')
+
+
+def load_discovery_document(fetch=fetch_discovery_document, ttl=DISCOVERY_TTL):
+    return cached('gmail-v1-discovery', ttl, fetch)
+
+
+# --- Credentials ---
+
+def needs_refresh(creds, margin=TOKEN_REFRESH_MARGIN, now=None):
+    """True when the access token is missing, expired, or about to expire."""
+    if not creds.token:
+        return True
+    if creds.expiry is None:
+        return not creds.valid
+    if now is None:
+        now = time.time()
+    # google-auth keeps expiry as a naive UTC datetime
+    expires_at = calendar.timegm(creds.expiry.timetuple())
+    return expires_at - now < margin
+
+
+def account_key(creds):
+    """A short, non-secret identifier for the signed-in account."""
+    source = creds.refresh_token or creds.client_id or creds.token or ''
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+
+
+# --- Service ---
+
+def build_gmail_service(creds, discovery_doc=None):
+    """Builds the Gmail service on one authorised, reusable connection pool."""
+    import google_auth_httplib2
+    import httplib2
+    from googleapiclient.discovery import build_from_document
+
+    if discovery_doc is None:
+        discovery_doc = load_discovery_document()
+    http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+    return build_from_document(discovery_doc, http=http)
+
+
+def get_sender_email(service, key, ttl=PROFILE_TTL):
+    """The account's email address, from cache or one getProfile call."""
+    def fetch_profile():
+        profile = service.users().getProfile(userId='me').execute()
+        return {'emailAddress': profile['emailAddress']}
+    return cached(f"profile-{key}", ttl, fetch_profile)['emailAddress']
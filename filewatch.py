@@ -0,0 +1,258 @@
+"""
+File watching and tailing for the Tk viewers.
+
+Watch tells a Tk app when a file changes. It uses inotify on the file's
+directory, so atomic replaces are seen too, and hooks the inotify fd into
+the Tk event loop. When inotify isn't available it falls back to
+os.stat() polling. FileTail then reads only the bytes appended since the
+last read. It notices when the file was truncated or rewritten, and in
+that case the caller reloads everything.
+
+    tail = FileTail(path)
+    lines = tail.read_all()
+    watch = Watch(root, path, on_change)   # on_change(): tail.read_new() ...
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import tkinter as tk
+
+# --- Configuration ---
+POLL_MS = 500
+# Bytes just before the read offset that must still match, or the file was rewritten
+FINGERPRINT_BYTES = 256
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class Inotify:
+    """Minimal non-blocking inotify through libc; raises OSError where unsupported."""
+
+    def __init__(self):
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            init = self._libc.inotify_init1
+        except (OSError, AttributeError):
+            raise OSError("inotify is not available on this system")
+        self.fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def read_events(self):
+        """Returns [(wd, mask, name)] for everything queued, or [] if nothing is."""
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, pos)
+            pos += _EVENT_HEADER.size
+            name = data[pos:pos + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+            pos += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class FileTail:
+    """Reads a text file incrementally, from the last known offset."""
+
+    def __init__(self, path, encoding='utf-8'):
+        self.path = path
+        self.encoding = encoding
+        self.offset = 0
+        self.inode = None
+        self.fingerprint = b''
+        self.partial = b''  # an unterminated last line, held back until it ends
+        self.open_line = False  # read_all() returned an unterminated last line
+
+    def _forget(self):
+        self.offset = 0
+        self.inode = None
+        self.fingerprint = b''
+        self.partial = b''
+        self.open_line = False
+
+    def read_all(self):
+        """
+        Reads the whole file and remembers where it ended; returns its lines.
+        An unterminated last line counts as a line here. Incremental reads
+        hold such a line back until its newline arrives.
+        """
+        self._forget()
+        lines = self._read_from(0)
+        if self.partial:
+            lines.append(self.partial.decode(self.encoding, 'replace'))
+            self.partial = b''
+            self.open_line = True
+        return lines
+
+    def read_new(self):
+        """
+        Returns (reset, lines). Normally reset is False and lines are the
+        complete lines appended since the last read. If the file was
+        truncated, replaced or rewritten, or text was appended to the
+        unterminated last line that read_all() returned, reset is True and
+        lines is the whole file again.
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            if self.inode is None:
+                return False, []
+            self._forget()
+            return True, []
+        if st.st_ino != self.inode or st.st_size < self.offset or not self._fingerprint_matches():
+            return True, self.read_all()
+        if st.st_size == self.offset:
+            return False, []
+        if self.open_line and not self._continues_with_newline():
+            # The caller already has that line; it grew rather than ended
+            return True, self.read_all()
+        return False, self._read_from(self.offset)
+
+    def _continues_with_newline(self):
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            return f.read(1) == b'\n'
+
+    def _fingerprint_matches(self):
+        if not self.fingerprint:
+            return True
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset - len(self.fingerprint))
+            return f.read(len(self.fingerprint)) == self.fingerprint
+
+    def _read_from(self, offset):
+        with open(self.path, 'rb') as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            f.seek(offset)
+            data = f.read()
+        self.offset = offset + len(data)
+        tail = self.fingerprint + data
+        self.fingerprint = tail[-FINGERPRINT_BYTES:]
+
+        if self.open_line and data:
+            # The newline ending the line read_all() already returned
+            if data.startswith(b'\n'):
+                data = data[1:]
+            self.open_line = False
+        data = self.partial + data
+        complete, sep, self.partial = data.rpartition(b'\n')
+        if not sep:
+            return []
+        return complete.decode(self.encoding, 'replace').split('\n')
+
+    def mark_written(self, data):
+        """Call with the bytes you just wrote to the file, so they aren't read back as new."""
+        self.inode = os.stat(self.path).st_ino
+        self.offset = len(data)
+        self.fingerprint = data[-FINGERPRINT_BYTES:]
+        self.partial = b''
+        self.open_line = bool(data) and not data.endswith(b'\n')
+
+
+class Watch:
+    """Calls `callback()` on the Tk thread whenever one of the watched files changes."""
+
+    def __init__(self, root, path, callback, names=None, poll_ms=POLL_MS):
+        self.root = root
+        self.callback = callback
+        self.directory = os.path.dirname(os.path.abspath(path))
+        self.names = set(names or (os.path.basename(path),))
+        self.poll_ms = poll_ms
+        self._after_id = None
+        self._inotify = None
+        self._closed = False
+
+        try:
+            self._inotify = Inotify()
+            self._inotify.add_watch(self.directory)
+        except OSError:
+            if self._inotify:
+                self._inotify.close()
+            self._inotify = None
+
+        if self._inotify:
+            try:
+                root.tk.createfilehandler(self._inotify.fd, tk.READABLE, self._on_readable)
+            except (AttributeError, tk.TclError):
+                # No Tcl file handlers on this build: drain the fd on a timer instead
+                self._schedule()
+        else:
+            self._stats = self._stat_all()
+            self._schedule()
+
+    @property
+    def using_inotify(self):
+        return self._inotify is not None
+
+    def _schedule(self):
+        self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    def _on_readable(self, fd=None, mask=None):
+        changed = False
+        for _, event_mask, name in self._inotify.read_events():
+            if name in self.names or event_mask & IN_Q_OVERFLOW:
+                changed = True
+        if changed:
+            self.callback()
+
+    def _stat_all(self):
+        stats = {}
+        for name in self.names:
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+                stats[name] = (st.st_ino, st.st_size, st.st_mtime_ns)
+            except FileNotFoundError:
+                stats[name] = None
+        return stats
+
+    def _poll(self):
+        self._after_id = None
+        if self._inotify:
+            self._on_readable()
+        else:
+            stats = self._stat_all()
+            if stats != self._stats:
+                self._stats = stats
+                self.callback()
+        if not self._closed:
+            self._schedule()
+
+    def close(self):
+        self._closed = True
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._inotify:
+            try:
+                self.root.tk.deletefilehandler(self._inotify.fd)
+            except (AttributeError, tk.TclError):
+                pass
+            self._inotify.close()
+            self._inotify = None
@@ -1,6 +1,10 @@
 import tkinter as tk
 from tkinter import ttk
 
+import profiling
+import tk_instrument
+from compact import LineStore
+
 # --- The dictionary of commands ---
 # The keys are what the user will type and what will be suggested.
 # The values could be anything (e.g., functions, descriptions, etc.).
@@ -44,7 +48,8 @@ class AutocompleteEntry(ttk.Entry):
     def __init__(self, master, autocomplete_list, **kwargs):
         super().__init__(master, **kwargs)
 
-        self.autocomplete_list = autocomplete_list
+        # Deduplicated, array-backed copy; large command lists repeat a lot
+        self.autocomplete_list = LineStore(autocomplete_list)
         self._listbox = None
         
         # --- Bind events ---
@@ -105,6 +110,7 @@ class AutocompleteEntry(ttk.Entry):
         if hasattr(self, '_listbox_frame') and self._listbox_frame.winfo_viewable():
             self._listbox_frame.place_forget()
 
+    @profiling.profiled('autocomplete key release')
     def _on_key_release(self, event):
         """Handles updating the suggestion list as the user types."""
         # Ignore control keys that don't change the text
@@ -204,7 +210,10 @@ class AutocompleteEntry(ttk.Entry):
 
 # --- Main Application Setup ---
 if __name__ == "__main__":
+    profiling.install('main')
+    tk_instrument.install()
     root = tk.Tk()
+    tk_instrument.watch(root)
     root.title("Autocomplete Command Entry")
     root.geometry("450x200")
 
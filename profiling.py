@@ -0,0 +1,385 @@
+"""
+Opt-in profiling for every py-assist tool (main.py, timer.py,
+timetracker.py, bd.py, bd-browser-highlighter.py and the email scheduler).
+
+Turn it on with an environment variable or a flag, naming what to collect:
+
+    PY_ASSIST_PROFILE=1 python3 bd.py                 # cprofile + memory + io
+    python3 timer.py --profile=sample,io              # sampler + byte counts
+    PY_ASSIST_PROFILE=memory python3 bd-browser-highlighter.py
+
+Modes:
+    cprofile  deterministic profile of the main thread (also saved as .prof)
+    sample    statistical sampler, every SAMPLE_INTERVAL_MS (also .folded stacks)
+    memory    tracemalloc snapshots at the points the tools mark with snapshot()
+    io        bytes read/written per operation(), from /proc/self/io
+
+Everything goes to one report per session in PROFILE_DIR (or
+PY_ASSIST_PROFILE_DIR), written at exit. When profiling is off,
+operation() hands back a shared no-op context manager and snapshot()
+returns straight away.
+"""
+
+import atexit
+import contextlib
+import functools
+import io
+import os
+import sys
+import threading
+import time
+
+# --- Configuration ---
+ENV_VAR = "PY_ASSIST_PROFILE"
+DIR_ENV_VAR = "PY_ASSIST_PROFILE_DIR"
+FLAG = "--profile"
+PROFILE_DIR = "/home/clawber/projects/py-assist/output/profiles/"
+
+MODES = ("cprofile", "sample", "memory", "io")
+DEFAULT_MODES = ("cprofile", "memory", "io")
+
+SAMPLE_INTERVAL_MS = 5
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 10
+
+_NULL = contextlib.nullcontext()
+
+
+def read_proc_io():
+    """(read_bytes, write_bytes) this process has passed through read()/write() so far."""
+    try:
+        with open("/proc/self/io", "rb") as f:
+            fields = dict(line.split(b":", 1) for line in f.read().splitlines())
+        return int(fields[b"rchar"]), int(fields[b"wchar"])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+
+class OperationStats:
+    __slots__ = ("name", "count", "total_ms", "max_ms", "read_bytes", "write_bytes")
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.read_bytes = 0
+        self.write_bytes = 0
+
+
+class _Operation:
+    """Times one operation and, in io mode, the bytes it read and wrote."""
+
+    def __init__(self, session, name):
+        self.session = session
+        self.name = name
+
+    def __enter__(self):
+        if self.session.count_io:
+            # Our own read of /proc/self/io is in here too; take it off at exit
+            self.io_start = read_proc_io()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.start) * 1000.0
+        stats = self.session.operations.get(self.name)
+        if stats is None:
+            stats = self.session.operations[self.name] = OperationStats(self.name)
+        stats.count += 1
+        stats.total_ms += ms
+        if ms > stats.max_ms:
+            stats.max_ms = ms
+        if self.session.count_io:
+            read, written = read_proc_io()
+            stats.read_bytes += max(0, read - self.io_start[0] - self.session.proc_io_cost)
+            stats.write_bytes += written - self.io_start[1]
+        return False
+
+
+class Sampler:
+    """Samples the main thread's stack from a background thread."""
+
+    def __init__(self, interval_ms=SAMPLE_INTERVAL_MS):
+        self.interval = interval_ms / 1000.0
+        self.thread_id = threading.main_thread().ident
+        self.stacks = {}   # "outer;...;inner" -> samples
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            key = ";".join(reversed(names))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def top_functions(self, limit=TOP_FUNCTIONS):
+        """[(samples, function)] by samples where the function was on top of the stack."""
+        leaves = {}
+        for stack, n in self.stacks.items():
+            leaf = stack.rsplit(";", 1)[-1].rsplit(":", 1)[0] + ")"
+            leaves[leaf] = leaves.get(leaf, 0) + n
+        return sorted(((n, name) for name, n in leaves.items()), reverse=True)[:limit]
+
+    def write_folded(self, path):
+        """Collapsed stacks, for flamegraph.pl or speedscope."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in self.stacks.items():
+                f.write(f"{stack} {n}\n")
+
+
+class Session:
+    """Everything collected in one profiled run of a tool."""
+
+    def __init__(self, tool, modes, report_dir):
+        self.tool = tool
+        self.modes = modes
+        self.started = time.time()
+        self.start_perf = time.perf_counter()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        self.base_path = os.path.join(report_dir, f"{tool}-{stamp}-{os.getpid()}")
+        self.report_dir = report_dir
+        self.operations = {}
+        self.snapshots = []  # report lines per snapshot
+        self.count_io = "io" in modes
+        self.proc_io_cost = 0
+        self.profiler = None
+        self.sampler = None
+        self._last_snapshot = None
+
+        if self.count_io:
+            before = read_proc_io()
+            self.proc_io_cost = read_proc_io()[0] - before[0]
+        if "memory" in modes:
+            import tracemalloc
+            tracemalloc.start()
+        if "cprofile" in modes:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        if "sample" in modes:
+            self.sampler = Sampler()
+            self.sampler.start()
+
+    def snapshot(self, label):
+        import tracemalloc
+        snap = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        elapsed = time.perf_counter() - self.start_perf
+        lines = [f"[{elapsed:8.3f}s] {label}: current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB"]
+        if self._last_snapshot is None:
+            stats = snap.statistics("lineno")[:TOP_ALLOCATIONS]
+            lines += [f"    {stat}" for stat in stats]
+        else:
+            stats = snap.compare_to(self._last_snapshot, "lineno")[:TOP_ALLOCATIONS]
+            lines += [f"    {stat}" for stat in stats if stat.size_diff]
+        self._last_snapshot = snap
+        self.snapshots.append(lines)
+
+    def finish(self):
+        """Stops collecting and writes the report; returns its path."""
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.sampler is not None:
+            self.sampler.stop()
+        if "memory" in self.modes:
+            self.snapshot("exit")
+
+        os.makedirs(self.report_dir, exist_ok=True)
+        report_path = self.base_path + ".txt"
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(self.report())
+        if self.profiler is not None:
+            self.profiler.dump_stats(self.base_path + ".prof")
+        if self.sampler is not None:
+            self.sampler.write_folded(self.base_path + ".folded")
+        return report_path
+
+    def report(self):
+        elapsed = time.perf_counter() - self.start_perf
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started))
+        lines = [
+            f"py-assist profile: {self.tool}",
+            f"started {started}, ran {elapsed:.3f}s, pid {os.getpid()}, modes {','.join(self.modes)}",
+            "",
+        ]
+
+        if self.operations:
+            lines.append("--- Operations ---")
+            lines.append(f"{'operation':<32} {'count':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"
+                         + (f" {'read':>10} {'written':>10}" if self.count_io else ""))
+            for s in sorted(self.operations.values(), key=lambda s: s.total_ms, reverse=True):
+                line = f"{s.name[:32]:<32} {s.count:>7} {s.total_ms:>10.2f} {s.total_ms / s.count:>9.2f} {s.max_ms:>9.2f}"
+                if self.count_io:
+                    line += f" {_size(s.read_bytes):>10} {_size(s.write_bytes):>10}"
+                lines.append(line)
+            lines.append("")
+
+        if self.snapshots:
+            lines.append("--- Memory (tracemalloc) ---")
+            for snapshot_lines in self.snapshots:
+                lines += snapshot_lines
+            lines.append("")
+
+        if self.profiler is not None:
+            import pstats
+            out = io.StringIO()
+            pstats.Stats(self.profiler, stream=out).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+            lines.append("--- cProfile (cumulative) ---")
+            lines.append(out.getvalue().strip())
+            lines.append(f"Full profile: {self.base_path}.prof")
+            lines.append("")
+
+        if self.sampler is not None:
+            lines.append(f"--- Sampling ({self.sampler.samples} samples every {SAMPLE_INTERVAL_MS}ms) ---")
+            for n, name in self.sampler.top_functions():
+                pct = 100.0 * n / self.sampler.samples if self.sampler.samples else 0.0
+                lines.append(f"{pct:6.1f}% {n:>7}  {name}")
+            lines.append(f"Collapsed stacks: {self.base_path}.folded")
+            lines.append("")
+
+        return "\n".join(lines)
+
+
+def _size(n):
+    for unit in ("B", "KiB", "MiB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
+
+# The active session, or None when profiling is off.
+_session = None
+
+
+def parse_modes(setting):
+    """Turns '1', 'all' or 'cprofile,io' into a tuple of modes (empty when off)."""
+    setting = setting.strip().lower()
+    if not setting or setting == "0":
+        return ()
+    if setting in ("1", "all", "true", "on"):
+        return DEFAULT_MODES
+    modes = []
+    for mode in setting.split(","):
+        mode = mode.strip()
+        if mode in MODES:
+            modes.append(mode)
+        elif mode:
+            print(f"profiling: ignoring unknown mode '{mode}' (use {', '.join(MODES)})", file=sys.stderr)
+    return tuple(modes)
+
+
+def _take_flag(argv):
+    """Removes --profile[=MODES] from argv; returns its setting or None."""
+    for i, arg in enumerate(argv[1:], 1):
+        if arg == FLAG:
+            del argv[i]
+            return "1"
+        if arg.startswith(FLAG + "="):
+            del argv[i]
+            return arg.split("=", 1)[1]
+    return None
+
+
+def install(tool, argv=None):
+    """
+    Starts profiling for this process if the --profile flag (removed from
+    argv, sys.argv by default) or PY_ASSIST_PROFILE asks for it. Call once
+    at startup. Returns the session, or None when profiling stays off.
+    """
+    global _session
+    if _session is not None:
+        return _session
+
+    setting = _take_flag(sys.argv if argv is None else argv)
+    if setting is None:
+        setting = os.environ.get(ENV_VAR, "")
+    modes = parse_modes(setting)
+    if not modes:
+        return None
+
+    report_dir = os.environ.get(DIR_ENV_VAR) or PROFILE_DIR
+    _session = Session(tool, modes, report_dir)
+    atexit.register(finish)
+    return _session
+
+
+def finish():
+    """
+    Writes the report now. Runs at exit anyway; call it first when the
+    process is about to be killed (e.g. timetracker closing its terminal).
+    """
+    global _session
+    session, _session = _session, None
+    if session is None:
+        return
+    try:
+        path = session.finish()
+    except OSError as e:
+        print(f"profiling: could not write report: {e}", file=sys.stderr)
+        return
+    print(f"profiling: report written to {path}", file=sys.stderr)
+
+
+def operation(name):
+    """Context manager that times `name` (and its file I/O in io mode)."""
+    if _session is None:
+        return _NULL
+    return _Operation(_session, name)
+
+
+def profiled(name):
+    """Decorator form of operation(); checks whether profiling is on at call time."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _session is None:
+                return func(*args, **kwargs)
+            with _Operation(_session, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def profiled_iter(name, iterable):
+    """Yields from iterable, timing the work behind each item as one `name` operation."""
+    if _session is None:
+        return iterable
+    return _profiled_iter(_session, name, iterable)
+
+
+def _profiled_iter(session, name, iterable):
+    iterator = iter(iterable)
+    while True:
+        with _Operation(session, name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def snapshot(label):
+    """Records a tracemalloc snapshot, diffed against the previous one, in memory mode."""
+    if _session is not None and "memory" in _session.modes:
+        _session.snapshot(label)
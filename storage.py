@@ -0,0 +1,370 @@
+"""
+One SQLite store for everything the py-assist tools write.
+
+Braindump lines (bd.py), logged tasks (timetracker.py) and lines sorted
+into categories (bd-browser-highlighter.py) are rows of a single
+`entries` table, indexed by time and by category, so questions that
+span tools are a single query. Sorting a braindump line just changes its
+kind and category.
+
+The database runs in WAL mode, so one tool can read while another
+writes. Each process shares one connection, and the SQL below is
+constant so sqlite3's statement cache reuses the prepared statements.
+Group writes with `with storage.batch():` to commit them together.
+
+The old text/JSON files can be imported once:
+
+    python3 storage.py import            # braindump.txt, time_log.json, and the
+                                         # category files in the current folder
+    python3 storage.py export braindump  # print entries as text, newest first
+"""
+
+import glob
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime
+
+from compact import LineStore, TimeLog
+
+# --- Configuration ---
+OUTPUT_DIR = "/home/clawber/projects/py-assist/output/"
+DB_FILE = os.path.join(OUTPUT_DIR, "py-assist.db")
+BRAINDUMP_FILE = os.path.join(OUTPUT_DIR, "braindump.txt")
+TIME_LOG_FILE = os.path.join(OUTPUT_DIR, "time_log.json")
+
+# Line sorter keys and the categories they sort into (bd-browser-highlighter.py)
+CATEGORIES = {
+    'u': 'urgent',
+    'd': 'do',
+    'l': 'lessons',
+    'c': 'create',
+    'e': 'experiences',
+    'b': 'bored',
+    'w': 'wins',
+    'x': 'deleted',
+    'q': 'questions'
+}
+
+# Entry kinds
+BRAINDUMP = 'braindump'
+TASK = 'task'
+SORTED = 'sorted'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,                    -- braindump, task, sorted
+    category TEXT,                         -- for sorted lines, e.g. 'urgent'
+    created_at INTEGER NOT NULL,           -- epoch milliseconds, UTC
+    utc_offset INTEGER NOT NULL DEFAULT 0, -- seconds east of UTC where it was written
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_created_at ON entries (created_at);
+CREATE INDEX IF NOT EXISTS entries_kind_created_at ON entries (kind, created_at);
+CREATE INDEX IF NOT EXISTS entries_category_created_at ON entries (category, created_at);
+CREATE TABLE IF NOT EXISTS imported_files (
+    path TEXT PRIMARY KEY,
+    imported_at INTEGER NOT NULL,
+    entries INTEGER NOT NULL
+);
+"""
+
+INSERT_ENTRY = 'INSERT INTO entries (kind, category, created_at, utc_offset, text) VALUES (?, ?, ?, ?, ?)'
+SELECT_COLUMNS = 'SELECT id, kind, category, created_at, utc_offset, text FROM entries'
+SELECT_RECENT = SELECT_COLUMNS + ' WHERE kind = ? ORDER BY created_at DESC, id DESC LIMIT ?'
+SELECT_KIND = SELECT_COLUMNS + ' WHERE kind = ? ORDER BY created_at DESC, id DESC'
+SELECT_CATEGORY = SELECT_COLUMNS + ' WHERE category = ? ORDER BY created_at, id'
+SELECT_LINES = 'SELECT id, text FROM entries WHERE kind = ? ORDER BY created_at DESC, id DESC'
+SELECT_LOG = 'SELECT created_at, utc_offset, text FROM entries WHERE kind = ? ORDER BY created_at, id'
+SELECT_LOG_RECENT = (
+    'SELECT created_at, utc_offset, text FROM ('
+    'SELECT id, created_at, utc_offset, text FROM entries WHERE kind = ? ORDER BY created_at DESC, id DESC LIMIT ?'
+    ') ORDER BY created_at, id'
+)
+SELECT_AFTER = SELECT_COLUMNS + ' WHERE kind = ? AND id > ? ORDER BY created_at DESC, id DESC'
+MOVE_ENTRY = 'UPDATE entries SET kind = ?, category = ? WHERE id = ?'
+
+_conn = None
+_conn_pid = None
+_batch_depth = 0
+_lock = threading.RLock()
+
+
+class Entry:
+    __slots__ = ('id', 'kind', 'category', 'created_at', 'utc_offset', 'text')
+
+    def __init__(self, entry_id, kind, category, created_at, utc_offset, text):
+        self.id = entry_id
+        self.kind = kind
+        self.category = category
+        self.created_at = created_at
+        self.utc_offset = utc_offset
+        self.text = text
+
+
+def _entry(row):
+    return Entry(*row)
+
+
+def connect(path=None):
+    """Returns this process's shared connection, opening it on first use."""
+    global _conn, _conn_pid
+    with _lock:
+        # A forked child must not reuse its parent's connection
+        if _conn is not None and _conn_pid == os.getpid():
+            return _conn
+        path = path or DB_FILE
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, cached_statements=64)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.executescript(SCHEMA)
+        _conn, _conn_pid = conn, os.getpid()
+        return conn
+
+
+def close():
+    global _conn, _conn_pid
+    with _lock:
+        if _conn is not None and _conn_pid == os.getpid():
+            _conn.close()
+        _conn = _conn_pid = None
+
+
+class batch:
+    """Runs the enclosed writes in one transaction; nested batches join the outer one."""
+
+    def __enter__(self):
+        global _batch_depth
+        _lock.acquire()
+        if _batch_depth == 0:
+            try:
+                connect().execute('BEGIN IMMEDIATE')
+            except BaseException:
+                _lock.release()
+                raise
+        _batch_depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _batch_depth
+        try:
+            _batch_depth -= 1
+            if _batch_depth == 0:
+                connect().execute('ROLLBACK' if exc_type else 'COMMIT')
+        finally:
+            _lock.release()
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+# --- Writing ---
+
+def add_entry(kind, text, category=None, created_at=None, utc_offset=0):
+    """Stores one entry and returns its id."""
+    if created_at is None:
+        created_at = now_ms()
+    with _lock:
+        return connect().execute(INSERT_ENTRY, (kind, category, created_at, utc_offset, text)).lastrowid
+
+
+def add_entries(rows):
+    """Stores (kind, text, category, created_at, utc_offset) rows in one transaction; returns how many."""
+    with batch():
+        conn = connect()
+        before = conn.total_changes
+        conn.executemany(
+            INSERT_ENTRY,
+            ((kind, category, created_at, utc_offset, text)
+             for kind, text, category, created_at, utc_offset in rows),
+        )
+        return conn.total_changes - before
+
+
+def move_entry(entry_id, kind, category=None):
+    """Changes an entry's kind and category, e.g. when a braindump line gets sorted."""
+    with _lock:
+        connect().execute(MOVE_ENTRY, (kind, category, entry_id))
+
+
+# --- Reading ---
+
+def recent(kind, limit=10):
+    """The newest `limit` entries of a kind, newest first."""
+    with _lock:
+        return [_entry(row) for row in connect().execute(SELECT_RECENT, (kind, limit))]
+
+
+def entries(kind):
+    """All entries of a kind, newest first."""
+    with _lock:
+        return [_entry(row) for row in connect().execute(SELECT_KIND, (kind,))]
+
+
+def load_lines(kind, table=None):
+    """(ids, texts) of every entry of a kind, newest first, as an array and a LineStore."""
+    ids = array('q')
+    texts = LineStore(table=table)
+    with _lock:
+        for entry_id, text in connect().execute(SELECT_LINES, (kind,)):
+            ids.append(entry_id)
+            texts.append(text)
+    return ids, texts
+
+
+def load_log(kind=TASK, limit=None, table=None):
+    """Every entry of a kind (or the newest `limit`), oldest first, as a compact TimeLog."""
+    log = TimeLog(table)
+    with _lock:
+        if limit is None:
+            log.extend(connect().execute(SELECT_LOG, (kind,)))
+        else:
+            log.extend(connect().execute(SELECT_LOG_RECENT, (kind, limit)))
+    return log
+
+
+def entries_after(kind, after_id):
+    """Entries of a kind added after the one with id `after_id`, newest first."""
+    with _lock:
+        return [_entry(row) for row in connect().execute(SELECT_AFTER, (kind, after_id))]
+
+
+def data_version():
+    """Changes whenever another connection commits to the database."""
+    with _lock:
+        return connect().execute('PRAGMA data_version').fetchone()[0]
+
+
+def in_category(category):
+    """Entries sorted into a category, oldest first (the order they were sorted in)."""
+    with _lock:
+        return [_entry(row) for row in connect().execute(SELECT_CATEGORY, (category,))]
+
+
+def between(start_ms, end_ms, kind=None):
+    """Entries of any (or one) kind created in [start_ms, end_ms), oldest first."""
+    sql = SELECT_COLUMNS + ' WHERE created_at >= ? AND created_at < ?'
+    params = [start_ms, end_ms]
+    if kind is not None:
+        sql = SELECT_COLUMNS + ' WHERE kind = ? AND created_at >= ? AND created_at < ?'
+        params.insert(0, kind)
+    with _lock:
+        return [_entry(row) for row in connect().execute(sql + ' ORDER BY created_at, id', params)]
+
+
+# --- Importing the old files ---
+
+def _already_imported(path):
+    return connect().execute('SELECT 1 FROM imported_files WHERE path = ?', (path,)).fetchone() is not None
+
+
+def _import(path, rows):
+    """Adds rows from one file in a single transaction, once per file."""
+    path = os.path.abspath(path)
+    with batch():
+        if _already_imported(path):
+            return 0
+        count = add_entries(rows)
+        connect().execute('INSERT INTO imported_files (path, imported_at, entries) VALUES (?, ?, ?)',
+                          (path, now_ms(), count))
+    return count
+
+
+def _file_mtime_ms(path):
+    return int(os.path.getmtime(path) * 1000)
+
+
+def import_braindump(path=BRAINDUMP_FILE):
+    """
+    Imports braindump.txt (newest line first). The file has no timestamps,
+    so lines are dated by the file's mtime, one millisecond apart, keeping
+    their order.
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = [line.rstrip('\n') for line in f if line.strip()]
+    newest = _file_mtime_ms(path)
+    return _import(path, ((BRAINDUMP, line, None, newest - i, 0) for i, line in enumerate(lines)))
+
+
+def import_time_log(path=TIME_LOG_FILE):
+    """Imports time_log.json ({ISO timestamp: task}), skipping and reporting bad entries."""
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    rows = []
+    for stamp, task in data.items():
+        try:
+            dt = datetime.fromisoformat(stamp)
+        except ValueError:
+            print(f"{os.path.basename(path)}: skipped {stamp!r}: not an ISO timestamp", file=sys.stderr)
+            continue
+        if not isinstance(task, str):
+            print(f"{os.path.basename(path)}: skipped {stamp!r}: task is not text", file=sys.stderr)
+            continue
+        offset = dt.utcoffset()
+        rows.append((TASK, task, None, int(dt.timestamp() * 1000), int(offset.total_seconds()) if offset else 0))
+    return _import(path, rows)
+
+
+def import_category_file(path):
+    """Imports one category file (urgent.txt, braindump-K.txt, ...), oldest line first."""
+    category = os.path.splitext(os.path.basename(path))[0]
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = [line.rstrip('\n') for line in f if line.strip()]
+    newest = _file_mtime_ms(path)
+    count = len(lines)
+    return _import(path, ((SORTED, line, category, newest - (count - i), 0) for i, line in enumerate(lines)))
+
+
+def category_file_names(folder):
+    """The files in folder the old line sorter wrote: <category>.txt and braindump-<KEY>.txt."""
+    names = [f"{category}.txt" for category in CATEGORIES.values()]
+    names += [os.path.basename(path) for path in glob.glob(os.path.join(glob.escape(folder), 'braindump-?.txt'))]
+    return sorted(name for name in names if os.path.isfile(os.path.join(folder, name)))
+
+
+def import_category_files(folder='.'):
+    """
+    Imports the category files in folder; returns {category: count}. The
+    old sorter appended to them in the folder it was run from, hence the
+    current folder by default.
+    """
+    imported = {}
+    for name in category_file_names(folder):
+        imported[os.path.splitext(name)[0]] = import_category_file(os.path.join(folder, name))
+    return imported
+
+
+def main(argv):
+    if argv[:1] == ['import']:
+        folders = argv[1:] or ['.']
+        print(f"braindump.txt: {import_braindump()} entries")
+        print(f"time_log.json: {import_time_log()} entries")
+        for folder in folders:
+            for category, count in import_category_files(folder).items():
+                print(f"{category}: {count} entries")
+        return 0
+    if len(argv) == 2 and argv[0] == 'export':
+        kind = argv[1]
+        rows = entries(kind) if kind in (BRAINDUMP, TASK) else in_category(kind)
+        for entry in rows:
+            print(entry.text)
+        return 0
+    print("Usage: storage.py import [FOLDER...] | export braindump|task|CATEGORY", file=sys.stderr)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,164 @@
+"""
+Tests for email-scheduler/dispatch.py against the fake Gmail service.
+
+    python3 -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'email-scheduler'))
+
+import dispatch
+from dispatch import TokenBucket, backoff_delay, dispatch_messages
+from fake_gmail import FakeGmailService, FakeHttpError
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ScriptedGmail(FakeGmailService):
+    """Fails sends to chosen recipients with the given statuses, in order."""
+
+    def __init__(self, failures=None, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = {to: list(statuses) for to, statuses in (failures or {}).items()}
+
+    def _call(self, method, kwargs):
+        if method == 'send':
+            statuses = self.failures.get(kwargs['body']['to'])
+            if statuses:
+                self.errors += 1
+                raise FakeHttpError(statuses.pop(0))
+        return super()._call(method, kwargs)
+
+
+def failing_first(new_batch, error, times=None):
+    """Wraps new_batch_http_request so the first `times` batches (default all) raise `error`."""
+    made = [0]
+
+    def wrapped(callback=None):
+        batch = new_batch(callback=callback)
+        made[0] += 1
+        if times is None or made[0] <= times:
+            def execute(http=None):
+                raise error
+            batch.execute = execute
+        return batch
+    return wrapped
+
+
+def jobs(count):
+    return [(i, f"user{i}@example.com", {'to': f"user{i}@example.com"}) for i in range(count)]
+
+
+class DispatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def dispatch(self, service, job_list, **options):
+        options.setdefault('rate', 1000)
+        options.setdefault('burst', 1000)
+        return list(dispatch_messages(service, job_list, clock=self.clock.time, sleep=self.clock.sleep,
+                                      rng=random.Random(1), **options))
+
+    def test_sends_in_batches(self):
+        service = ScriptedGmail()
+        results = self.dispatch(service, jobs(120), batch_size=50)
+        self.assertEqual(service.batches, 3)
+        self.assertEqual(len(service.sent), 120)
+        self.assertEqual(sorted(r.key for r in results), list(range(120)))
+        self.assertTrue(all(r.status == 'sent' and r.attempts == 1 and r.message_id for r in results))
+
+    def test_retries_429_and_5xx_with_backoff(self):
+        service = ScriptedGmail({'user0@example.com': [429, 503]})
+        results = {r.key: r for r in self.dispatch(service, jobs(2), base_delay=1.0)}
+        self.assertEqual((results[0].status, results[0].attempts), ('sent', 3))
+        self.assertEqual((results[1].status, results[1].attempts), ('sent', 1))
+        # Waited at least the jittered minimum of both backoffs (0.5s + 1s)
+        self.assertGreaterEqual(sum(self.clock.sleeps), 1.5)
+
+    def test_gives_up_after_max_attempts(self):
+        service = ScriptedGmail({'user0@example.com': [503] * 10})
+        [result] = self.dispatch(service, jobs(1), max_attempts=3)
+        self.assertEqual((result.status, result.attempts), ('failed', 3))
+        self.assertIn('503', result.error)
+
+    def test_client_errors_are_not_retried(self):
+        service = ScriptedGmail({'user0@example.com': [400]})
+        [result] = self.dispatch(service, jobs(1))
+        self.assertEqual((result.status, result.attempts), ('failed', 1))
+
+    def test_transport_errors_are_retried(self):
+        service = ScriptedGmail()
+        service.new_batch_http_request = failing_first(service.new_batch_http_request,
+                                                       ConnectionResetError("connection reset"), times=1)
+        [result] = self.dispatch(service, jobs(1))
+        self.assertEqual((result.status, result.attempts), ('sent', 2))
+
+    def test_programming_errors_propagate(self):
+        service = ScriptedGmail()
+        service.new_batch_http_request = failing_first(service.new_batch_http_request, KeyError('oops'))
+        with self.assertRaises(KeyError):
+            self.dispatch(service, jobs(1))
+
+    def test_rate_limit_paces_sends(self):
+        service = ScriptedGmail()
+        start = self.clock.now
+        self.dispatch(service, jobs(12), rate=2, burst=2, batch_size=50)
+        # 2 sends ride the burst, the other 10 wait half a second each
+        self.assertAlmostEqual(self.clock.now - start, 5.0, places=3)
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=4, capacity=2, clock=clock.time, sleep=clock.sleep)
+        for _ in range(2):
+            bucket.acquire()
+        self.assertEqual(clock.sleeps, [])
+        for _ in range(4):
+            bucket.acquire()
+        self.assertAlmostEqual(clock.now - 1000.0, 1.0, places=6)
+
+    def test_refills_up_to_capacity(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=3, clock=clock.time, sleep=clock.sleep)
+        for _ in range(3):
+            bucket.acquire()
+        clock.now += 100
+        for _ in range(3):
+            bucket.acquire()
+        self.assertEqual(clock.sleeps, [])
+        bucket.acquire()
+        self.assertAlmostEqual(clock.sleeps[-1], 1.0, places=6)
+
+
+class BackoffTest(unittest.TestCase):
+
+    def test_exponential_with_jitter_and_cap(self):
+        rng = random.Random(3)
+        for attempt in range(1, 10):
+            ceiling = min(dispatch.MAX_DELAY, 2 ** (attempt - 1))
+            for _ in range(50):
+                delay = backoff_delay(attempt, rng, base=1.0)
+                self.assertGreaterEqual(delay, ceiling / 2)
+                self.assertLessEqual(delay, ceiling)
+
+
+if __name__ == '__main__':
+    unittest.main()
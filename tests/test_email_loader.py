@@ -0,0 +1,95 @@
+"""
+Tests for the streaming reader in email-scheduler/email_loader.py.
+
+    python3 -m unittest discover tests
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'email-scheduler'))
+
+import email_loader
+from email_loader import EmailFileError, iter_email_records, parse_datetime
+
+RECORDS = [
+    {'to': 'a@example.com', 'subject': 'Café \\u00e9 "quoted"', 'body': 'line\nline ' * 5,
+     'send_time': '2025-08-15 14:30', 'n': 12.5e3, 'flags': [True, False, None]},
+    {'to': 'b@example.com', 'subject': 'x' * 40, 'body': '', 'send_time': '2025-08-15 14:30:00', 'n': -7},
+]
+
+
+class StreamingReaderTest(unittest.TestCase):
+
+    def write(self, text):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        self.addCleanup(os.unlink, path)
+        return path
+
+    def test_values_split_at_every_chunk_boundary(self):
+        text = json.dumps(RECORDS, indent=1)
+        path = self.write(text)
+        for chunk_size in range(1, 40):
+            with mock.patch.object(email_loader, 'CHUNK_SIZE', chunk_size):
+                records = [record for _, record in iter_email_records(path)]
+            self.assertEqual(records, RECORDS, f"chunk size {chunk_size}")
+
+    def test_syntax_error_stops_reading(self):
+        good = json.dumps(RECORDS[1])
+        path = self.write('[' + good + ', {"to": oops}, ' + ', '.join([good] * 2000) + ']')
+        reads = []
+        original_fill = email_loader._Reader.fill
+
+        def counting_fill(reader):
+            reads.append(1)
+            return original_fill(reader)
+
+        with mock.patch.object(email_loader, 'CHUNK_SIZE', 256), \
+                mock.patch.object(email_loader._Reader, 'fill', counting_fill):
+            with self.assertRaises(EmailFileError) as caught:
+                list(iter_email_records(path))
+        self.assertEqual(caught.exception.index, 2)
+        # The whole file is ~200 chunks; the error is in the first one or two
+        self.assertLess(len(reads), 5)
+
+
+class ParseDatetimeTest(unittest.TestCase):
+
+    def setUp(self):
+        original = os.environ.get('TZ')
+
+        def restore():
+            if original is None:
+                os.environ.pop('TZ', None)
+            else:
+                os.environ['TZ'] = original
+            time.tzset()
+            parse_datetime.cache_clear()
+        self.addCleanup(restore)
+        os.environ['TZ'] = 'Asia/Manila'
+        time.tzset()
+        parse_datetime.cache_clear()
+
+    def test_naive_times_are_local(self):
+        # 14:30 in Manila is 06:30 UTC
+        self.assertEqual(parse_datetime('2025-08-15 14:30'), 1755239400000)
+        self.assertEqual(parse_datetime('2025-08-15 14:30:00'), 1755239400000)
+
+    def test_offset_wins_over_local_zone(self):
+        self.assertEqual(parse_datetime('2025-08-15 06:30+00:00'), 1755239400000)
+        self.assertEqual(parse_datetime('2025-08-15 02:30:00-0400'), 1755239400000)
+
+    def test_bad_format(self):
+        with self.assertRaises(ValueError):
+            parse_datetime('15/08/2025 14:30')
+
+
+if __name__ == '__main__':
+    unittest.main()
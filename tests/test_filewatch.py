@@ -0,0 +1,62 @@
+"""
+Tests for filewatch.FileTail.
+
+    python3 -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from filewatch import FileTail
+
+
+class FileTailTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.txt')
+        os.close(fd)
+        self.addCleanup(os.unlink, self.path)
+
+    def write(self, data, mode='ab'):
+        with open(self.path, mode) as f:
+            f.write(data)
+
+    def test_appended_lines(self):
+        self.write(b'a\nb\n', 'wb')
+        tail = FileTail(self.path)
+        self.assertEqual(tail.read_all(), ['a', 'b'])
+        self.write(b'c\nd')
+        self.assertEqual(tail.read_new(), (False, ['c']))
+        self.write(b'\n')
+        self.assertEqual(tail.read_new(), (False, ['d']))
+
+    def test_text_appended_to_unterminated_last_line(self):
+        self.write(b'a\nb', 'wb')
+        tail = FileTail(self.path)
+        self.assertEqual(tail.read_all(), ['a', 'b'])
+        self.write(b'c\n')
+        self.assertEqual(tail.read_new(), (True, ['a', 'bc']))
+        self.write(b'd\n')
+        self.assertEqual(tail.read_new(), (False, ['d']))
+
+    def test_newline_ending_unterminated_last_line(self):
+        self.write(b'a\nb', 'wb')
+        tail = FileTail(self.path)
+        tail.read_all()
+        self.write(b'\nc\n')
+        self.assertEqual(tail.read_new(), (False, ['c']))
+
+    def test_rewritten_file(self):
+        self.write(b'a\nb\n', 'wb')
+        tail = FileTail(self.path)
+        tail.read_all()
+        self.write(b'x\ny\n', 'wb')
+        self.assertEqual(tail.read_new(), (True, ['x', 'y']))
+
+
+if __name__ == '__main__':
+    unittest.main()
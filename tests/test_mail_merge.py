@@ -0,0 +1,48 @@
+"""
+Tests for the raw messages built by email-scheduler/mail_merge.py.
+
+    python3 -m unittest discover tests
+"""
+
+import base64
+import email
+import os
+import re
+import sys
+import unittest
+from email import policy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'email-scheduler'))
+
+from mail_merge import MessageEncoder
+
+BARE_LINE_BREAK = re.compile(rb'(?<!\r)\n|\r(?!\n)')
+
+
+class MessageEncoderTest(unittest.TestCase):
+
+    def encode(self, to, subject, body):
+        raw = MessageEncoder('Sender <me@example.com>').encode(to, subject, body, '<k1@py-assist.local>')['raw']
+        return base64.urlsafe_b64decode(raw)
+
+    def test_long_non_ascii_subject_folds_with_crlf(self):
+        subject = 'Paalala: pulong sa Miyerkules — ' + 'Ünïcödé ' * 20
+        raw = self.encode('Ana Reyes <ana@example.com>', subject, 'Hi\nthere')
+        headers = raw.split(b'\r\n\r\n', 1)[0]
+        self.assertIn(b'\r\n ', headers)  # it really was folded
+        self.assertIsNone(BARE_LINE_BREAK.search(raw))
+        message = email.message_from_bytes(raw, policy=policy.default)
+        self.assertEqual(message['Subject'], subject)
+        self.assertEqual(message['Message-ID'], '<k1@py-assist.local>')
+
+    def test_non_ascii_body_and_display_name(self):
+        raw = self.encode('José Rizal <jose@example.com>', 'Hello', 'Magandang araw, José\n')
+        self.assertIsNone(BARE_LINE_BREAK.search(raw))
+        message = email.message_from_bytes(raw, policy=policy.default)
+        self.assertEqual(message['To'].addresses[0].display_name, 'José Rizal')
+        # Text is CRLF-canonical before it is base64-encoded
+        self.assertEqual(message.get_content(), 'Magandang araw, José\r\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
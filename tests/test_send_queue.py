@@ -0,0 +1,162 @@
+"""
+Tests for email-scheduler/send_queue.py with a fake clock and fake Gmail.
+
+    python3 -m unittest discover tests
+"""
+
+import base64
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'email-scheduler'))
+
+import send_queue
+from fake_gmail import FakeGmailService, FakeHttpError
+from send_queue import SendQueue, message_id_for, recover, run_dispatcher
+
+START_S = 1_750_000_000
+
+
+class FakeClock:
+    def __init__(self, now=START_S):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ScriptedGmail(FakeGmailService):
+    """Fails sends to chosen recipients with the given statuses, in order, and records send times."""
+
+    def __init__(self, clock, failures=None, **kwargs):
+        super().__init__(**kwargs)
+        self.clock = clock
+        self.failures = {to: list(statuses) for to, statuses in (failures or {}).items()}
+        self.sent_at = []
+
+    def _call(self, method, kwargs):
+        if method == 'send':
+            statuses = self.failures.get(self._message_id_header(kwargs['body']))
+            if statuses:
+                self.errors += 1
+                raise FakeHttpError(statuses.pop(0))
+            self.sent_at.append(self.clock.time())
+        return super()._call(method, kwargs)
+
+
+def fake_raw(key):
+    raw = f"Message-ID: {message_id_for(key)}\r\nTo: x@example.com\r\n\r\nhi\r\n".encode()
+    return {'raw': base64.urlsafe_b64encode(raw).decode()}
+
+
+def row(key, send_at_s):
+    return key, send_at_s * 1000, f"{key}@example.com", fake_raw(key)
+
+
+class SendQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.queue = SendQueue(os.path.join(workdir.name, 'queue.db'))
+        self.addCleanup(self.queue.close)
+        self.clock = FakeClock()
+        self.service = ScriptedGmail(self.clock, sleep=self.clock.sleep)
+
+    def dispatch(self, **options):
+        return list(run_dispatcher(self.queue, self.service, clock=self.clock.time, sleep=self.clock.sleep,
+                                   rate=1000, burst=1000, **options))
+
+    def test_enqueue_ignores_duplicates(self):
+        self.assertEqual(self.queue.enqueue_many([row('a', START_S), row('b', START_S)]), 2)
+        self.assertEqual(self.queue.enqueue_many([row('a', START_S + 60), row('b', START_S)]), 0)
+        self.assertEqual(self.queue.next_due_at(), START_S * 1000)
+
+    def test_enqueue_requeues_failed(self):
+        self.queue.enqueue_many([row('a', START_S), row('b', START_S)])
+        [a, b] = self.queue.claim_due(START_S * 1000)
+        self.queue.mark_failed(a.id, 'HTTP 400')
+        self.queue.mark_sent(b.id, 'gmail-b')
+        self.assertEqual(self.queue.enqueue_many([row('a', START_S + 60), row('b', START_S + 60)]), 1)
+        self.assertEqual(self.queue.counts(), {'pending': 1, 'sent': 1})
+        self.assertEqual(self.queue.next_due_at(), (START_S + 60) * 1000)
+
+    def test_claim_due_takes_earliest_due_only(self):
+        self.queue.enqueue_many([row('late', START_S + 30), row('future', START_S + 3600),
+                                 row('early', START_S - 30), row('now', START_S)])
+        claimed = self.queue.claim_due(START_S * 1000 + 30_000, limit=2)
+        self.assertEqual([email.key for email in claimed], ['early', 'now'])
+        self.assertEqual(claimed[0].body, fake_raw('early'))
+        self.assertEqual(self.queue.counts(), {'pending': 2, 'sending': 2})
+        self.assertEqual([email.key for email in self.queue.claim_due(START_S * 1000 + 30_000)], ['late'])
+        self.assertEqual(self.queue.claim_due(START_S * 1000 + 30_000), [])
+
+    def test_dispatcher_waits_for_send_time(self):
+        self.queue.enqueue_many([row('a', START_S + 600), row('b', START_S + 60), row('c', START_S - 5)])
+        waits = []
+        results = self.dispatch(on_wait=waits.append)
+        self.assertEqual([r.status for r in results], ['sent'] * 3)
+        self.assertEqual(self.service.sent_at, [START_S, START_S + 60, START_S + 600])
+        self.assertEqual(waits, [60.0, 540.0])
+        self.assertEqual(self.queue.counts(), {'sent': 3})
+
+    def test_dispatcher_retries_and_records_failures(self):
+        self.service.failures = {
+            message_id_for('flaky'): [503, 429],
+            message_id_for('bad'): [400],
+        }
+        self.queue.enqueue_many([row('flaky', START_S), row('bad', START_S), row('ok', START_S)])
+        results = {r.key: r for r in self.dispatch(base_delay=1.0)}
+        statuses = dict(self.queue.conn.execute('SELECT idempotency_key, status FROM queue'))
+        self.assertEqual(statuses, {'flaky': 'sent', 'bad': 'failed', 'ok': 'sent'})
+        self.assertEqual(sorted(r.attempts for r in results.values()), [1, 1, 3])
+        error = self.queue.conn.execute("SELECT error FROM queue WHERE idempotency_key = 'bad'").fetchone()[0]
+        self.assertIn('400', error)
+
+    def test_recovers_emails_in_flight_at_a_crash(self):
+        self.queue.enqueue_many([row('delivered', START_S), row('lost', START_S)])
+        # Crash: both claimed, only one reached Gmail, no outcome recorded
+        delivered, lost = self.queue.claim_due(START_S * 1000)
+        self.service.users().messages().send(userId='me', body=delivered.body).execute()
+        self.assertEqual(len(self.service.sent), 1)
+
+        self.assertEqual(recover(self.queue, self.service), (1, 1))
+        self.assertEqual(self.queue.counts(), {'pending': 1, 'sent': 1})
+        results = self.dispatch()
+        self.assertEqual([r.status for r in results], ['sent'])
+        self.assertEqual(len(self.service.sent), 2)
+        self.assertEqual(sorted(FakeGmailService._message_id_header(body) for body in self.service.sent),
+                         sorted([message_id_for('delivered'), message_id_for('lost')]))
+
+    def test_dispatcher_recovers_before_sending(self):
+        self.queue.enqueue_many([row('delivered', START_S)])
+        [email] = self.queue.claim_due(START_S * 1000)
+        self.service.users().messages().send(userId='me', body=email.body).execute()
+        self.assertEqual(self.dispatch(), [])
+        self.assertEqual(len(self.service.sent), 1)
+        self.assertEqual(self.queue.counts(), {'sent': 1})
+
+
+class MessageIdTest(unittest.TestCase):
+
+    def test_plain_keys_are_kept(self):
+        self.assertEqual(message_id_for('campaign-42_a'), f"<campaign-42_a@{send_queue.MESSAGE_ID_DOMAIN}>")
+
+    def test_other_keys_are_hashed(self):
+        for key in ('a b', 'x>y', 'line\nbreak', 'café', 'k' * 65):
+            message_id = message_id_for(key)
+            local = message_id[1:-1].split('@')[0]
+            self.assertRegex(local, r'\A[0-9a-f]{32}\Z')
+            self.assertEqual(message_id, message_id_for(key))
+        self.assertNotEqual(message_id_for('a b'), message_id_for('a  b'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Tests for importing the old text/JSON files into storage.py.
+
+    python3 -m unittest discover tests
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage
+
+
+class ImportTest(unittest.TestCase):
+
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.folder = workdir.name
+        storage.close()
+        storage.connect(os.path.join(self.folder, 'test.db'))
+        self.addCleanup(storage.close)
+
+    def write(self, name, text):
+        path = os.path.join(self.folder, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def test_only_sorter_files_are_imported(self):
+        self.write('urgent.txt', 'fix the roof\ncall mom\n')
+        self.write('braindump-K.txt', 'kettle\n')
+        self.write('braindump.txt', 'not a category\n')
+        self.write('notes.txt', 'unrelated\n')
+        self.write('braindump-old.txt', 'unrelated too\n')
+        self.assertEqual(storage.import_category_files(self.folder), {'braindump-K': 1, 'urgent': 2})
+        self.assertEqual([e.text for e in storage.in_category('urgent')], ['fix the roof', 'call mom'])
+        # Once per file
+        self.assertEqual(storage.import_category_files(self.folder), {'braindump-K': 0, 'urgent': 0})
+
+    def test_bad_time_log_entries_are_skipped(self):
+        path = self.write('time_log.json', json.dumps({
+            '2025-06-28T03:54:02+08:00': 'write report',
+            'yesterday-ish': 'lost stamp',
+            '2025-06-28T09:00:00+08:00': ['not', 'text'],
+            '2025-06-28T10:30:00+08:00': 'lunch',
+        }))
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(storage.import_time_log(path), 2)
+        self.assertIn("'yesterday-ish'", stderr.getvalue())
+        self.assertIn("'2025-06-28T09:00:00+08:00'", stderr.getvalue())
+        log = storage.load_log(storage.TASK)
+        self.assertEqual([entry.text for entry in log], ['write report', 'lunch'])
+        self.assertEqual([entry.utc_offset for entry in log], [28800, 28800])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,10 +25,13 @@ alarm sound
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import threading
 import time
-from playsound import playsound
-import os
+import math
+
+import alarm_audio
+import profiling
+import tk_instrument
+from timer_engine import TimerEngine, TIMERS_FILE
 
 # --- Configuration ---
 ALARM_SOUND_FILE = "alarm-rooster.wav" 
@@ -38,12 +41,19 @@ class TimerApp:
         """Initialize the Timer Application."""
         self.master = master
         self.master.title("Persistent Popup Timer")
-        self.master.geometry("350x200")
+        self.master.geometry("350x360")
 
         # --- State Variables ---
-        self.remaining_seconds = 0
-        self.timer_running = False
+        # All timers live in the engine as monotonic deadlines; the GUI only
+        # ever has one after() pending, armed for the next thing to happen.
+        self.engine = TimerEngine(TIMERS_FILE)
         self.timer_id = None
+        self.scheduling = False  # inside schedule_next() (alarms run nested event loops)
+
+        # Decode the alarm sound now, off the GUI thread, so firing an alarm
+        # only has to queue an already-decoded buffer.
+        self.audio = alarm_audio.default_player()
+        self.audio.preload(ALARM_SOUND_FILE)
 
         # --- Style Configuration ---
         style = ttk.Style()
@@ -54,6 +64,15 @@ class TimerApp:
 
         self.create_widgets()
 
+        # While iconic only the deadline is scheduled; pick the countdown back
+        # up as soon as the window is shown again
+        self.master.bind("<Map>", self.on_map)
+
+        # Pick up timers that were running when the app was last closed
+        self.engine.load()
+        self.refresh_timer_list()
+        self.schedule_next()
+
     def create_widgets(self):
         """Create and lay out all the GUI widgets."""
         main_frame = ttk.Frame(self.master, padding="20")
@@ -79,73 +98,124 @@ class TimerApp:
         self.stop_button = ttk.Button(button_frame, text="Stop", command=self.stop_timer, state=tk.DISABLED)
         self.stop_button.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=(5, 0))
 
+        # Running timers, soonest first. Rows show the end time rather than a
+        # live countdown so they never need to be redrawn while waiting.
+        self.timer_list = tk.Listbox(main_frame, height=6, font=("Helvetica", 11), selectmode=tk.EXTENDED)
+        self.timer_list.pack(pady=(10, 0), fill=tk.BOTH, expand=True)
+        self.listed_ids = []
+
     def start_timer(self):
-        """Starts the countdown timer."""
-        if self.timer_running: return
+        """Adds a new countdown timer; any number can run at once."""
         try:
             minutes = float(self.entry.get())
-            if minutes <= 0: raise ValueError
-            self.remaining_seconds = int(minutes * 60)
+            if not math.isfinite(minutes) or minutes <= 0: raise ValueError
         except (ValueError, TypeError):
             messagebox.showerror("Invalid Input", "Please enter a valid positive number for minutes.")
             return
 
-        self.timer_running = True
-        self.toggle_controls(active=False)
-        self.update_countdown()
+        self.engine.add(minutes * 60, label=f"{minutes:g} min")
+        self.entry.delete(0, tk.END)
+        self.refresh_timer_list()
+        self.schedule_next()
         
     def stop_timer(self):
-        """Stops the currently running timer."""
-        if self.timer_running and self.timer_id:
-            self.master.after_cancel(self.timer_id)
-        
-        self.timer_running = False
-        self.remaining_seconds = 0
-        self.time_label.config(text="00:00")
-        self.toggle_controls(active=True)
+        """Stops the selected timers, or all of them if none are selected."""
+        selected = self.timer_list.curselection()
+        with self.engine.batch():  # one save for the whole selection
+            if selected:
+                for index in selected:
+                    self.engine.cancel(self.listed_ids[index])
+            else:
+                self.engine.cancel_all()
+
+        self.refresh_timer_list()
+        self.schedule_next()
 
     def toggle_controls(self, active):
         """Enable or disable controls based on timer state."""
-        state = tk.NORMAL if active else tk.DISABLED
-        self.entry.config(state=state)
-        self.start_button.config(state=state)
         self.stop_button.config(state=tk.NORMAL if not active else tk.DISABLED)
 
-    def update_countdown(self):
-        """The main loop that updates the timer every second."""
-        if self.timer_running and self.remaining_seconds > 0:
-            self.remaining_seconds -= 1
-            mins, secs = divmod(self.remaining_seconds, 60)
-            self.time_label.config(text=f"{mins:02d}:{secs:02d}")
-            self.timer_id = self.master.after(1000, self.update_countdown)
-        elif self.timer_running and self.remaining_seconds == 0:
+    def refresh_timer_list(self):
+        """Redraws the list of running timers (only called when it changes)."""
+        timers = self.engine.active()
+        self.listed_ids = [t.id for t in timers]
+        self.timer_list.delete(0, tk.END)
+        for t in timers:
+            ends_at = time.strftime("%H:%M:%S", time.localtime(t.wall_deadline))
+            self.timer_list.insert(tk.END, f"{t.label}  (ends {ends_at})")
+        self.toggle_controls(active=not timers)
+
+    def on_map(self, event):
+        # <Map> on the root also fires for every child widget. trigger_alarm()
+        # maps the window itself from inside schedule_next(), which re-arms
+        # the countdown when it's done anyway.
+        if event.widget is self.master and not self.scheduling:
+            self.schedule_next()
+
+    @profiling.profiled('schedule_next')
+    def schedule_next(self):
+        """
+        Fires any due timers, updates the display, and arms a single after()
+        for whichever comes first: the next deadline or the next change of
+        the displayed countdown.
+        """
+        self.scheduling = True
+        try:
+            self._schedule_next()
+        finally:
+            self.scheduling = False
+
+    def _schedule_next(self):
+        if self.timer_id:
+            self.master.after_cancel(self.timer_id)
+            self.timer_id = None
+
+        now = time.monotonic()
+        due = self.engine.pop_due(now)
+        if due:
+            self.refresh_timer_list()
             self.time_label.config(text="Done!")
-            self.trigger_alarm()
-            self.stop_timer()
+            for timer in due:
+                self.trigger_alarm(timer)
+            # The alarm dialog blocks, so re-read the clock before continuing
+            now = time.monotonic()
+            if self.engine.seconds_until_next(now) == 0:
+                self.timer_id = self.master.after_idle(self.schedule_next)
+                return
+
+        soonest = self.engine.peek()
+        if soonest is None:
+            if not due:
+                self.time_label.config(text="00:00")
+            return
 
-    def trigger_alarm(self):
+        remaining = self.engine.remaining(soonest, now)
+        shown = math.ceil(remaining)
+        mins, secs = divmod(shown, 60)
+        self.time_label.config(text=f"{mins:02d}:{secs:02d}")
+
+        if self.master.state() == "iconic":
+            # Nobody can see the countdown; just wake up for the deadline.
+            delay = remaining
+        else:
+            # Wake when the shown value next changes (it is rounded up, so
+            # that happens when `remaining` drops to shown - 1).
+            delay = remaining - (shown - 1)
+        self.timer_id = self.master.after(max(1, int(delay * 1000) + 1), self.schedule_next)
+
+    def trigger_alarm(self, timer=None):
         """Handles the entire alarm sequence: sound, and a persistent pop-up."""
-        print("ALARM! Time's up.")
-        
-        # --- Play Sound in a separate thread to not block the GUI ---
-        def play_sound_task():
-            try:
-                if os.path.exists(ALARM_SOUND_FILE):
-                    playsound(ALARM_SOUND_FILE)
-                else:
-                    print(f"Warning: Alarm sound file not found: '{ALARM_SOUND_FILE}'")
-                    # Fallback system beep for Linux
-                    os.system('beep -f 500 -l 400 &') 
-            except Exception as e:
-                print(f"Error playing sound: {e}")
+        label = f" ({timer.label})" if timer else ""
+        print(f"ALARM! Time's up{label}.")
         
-        sound_thread = threading.Thread(target=play_sound_task, daemon=True)
-        sound_thread.start()
+        # --- Play Sound on the audio worker so the GUI isn't blocked ---
+        with profiling.operation('play alarm'):
+            self.audio.play(ALARM_SOUND_FILE)
 
         # --- Force Window to Front and Demand Attention ---
-        self.force_window_to_front()
+        self.force_window_to_front(label)
 
-    def force_window_to_front(self):
+    def force_window_to_front(self, label=""):
         """
         This is the key function to make the window appear and stay.
         It brings the window to the front and shows a modal dialog.
@@ -166,7 +236,7 @@ class TimerApp:
         #    the user clicks "OK". This is our dismissal mechanism.
         messagebox.showinfo(
             title="Time's Up!",
-            message=f"Your timer has finished.\nPress OK to dismiss."
+            message=f"Your timer{label} has finished.\nPress OK to dismiss."
         )
 
         # 6. Once the user clicks "OK", turn off the "topmost" attribute
@@ -174,6 +244,10 @@ class TimerApp:
         self.master.attributes('-topmost', False)
 
 if __name__ == "__main__":
+    profiling.install('timer')
+    tk_instrument.install()
     root = tk.Tk()
+    tk_instrument.watch(root)
     app = TimerApp(root)
+    profiling.snapshot('timers loaded')
     root.mainloop()
\ No newline at end of file
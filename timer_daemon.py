@@ -0,0 +1,270 @@
+"""
+Headless timer daemon.
+
+Runs the same TimerEngine as TimerApp on an asyncio loop, with no Tk
+interpreter or window resident. The loop sleeps until the next deadline
+and is only woken early when a client changes the timer set. Tk is
+imported only when an alarm actually fires, to show the pop-up.
+
+    python3 timer_daemon.py serve &
+    python3 timer_daemon.py start 25 pomodoro
+    python3 timer_daemon.py list
+    python3 timer_daemon.py stop 3        # or: stop all
+    python3 timer_daemon.py stats         # RSS and wakeups per minute
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+
+from timer_engine import TimerEngine
+
+# --- Configuration ---
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), f"py-assist-timer-{os.getuid()}.sock")
+# Kept apart from TimerApp's timers.json so both can run at once.
+DAEMON_TIMERS_FILE = "/home/clawber/projects/py-assist/output/timers-daemon.json"
+ALARM_SOUND_FILE = "alarm-rooster.wav"
+
+
+def read_rss_kb(pid="self"):
+    """Resident set size in KiB, read from /proc."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def show_alert(label):
+    """Pops up a topmost message box. Tk is only loaded here."""
+    try:
+        import tkinter as tk
+        from tkinter import messagebox
+        root = tk.Tk()
+        root.withdraw()
+        root.attributes("-topmost", True)
+        messagebox.showinfo(
+            title="Time's Up!",
+            message=f"Your timer{label} has finished.\nPress OK to dismiss.",
+            parent=root,
+        )
+        root.destroy()
+    except Exception as e:
+        print(f"Could not show alert window: {e}")
+
+
+class TimerDaemon:
+    """Owns the engine, the wait loop and the control socket."""
+
+    def __init__(self, engine, alert=show_alert, sound=ALARM_SOUND_FILE):
+        self.engine = engine
+        self.alert = alert
+        self.sound = sound
+        self.wakeups = 0
+        self.started = time.monotonic()
+        self._changed = None
+        self._stopping = None
+        # One alert at a time; each needs its own Tk interpreter on this thread.
+        self._alerts = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    # --- Timer loop ---
+
+    async def run_timers(self):
+        """Sleeps until the next deadline (or a change), then fires due timers."""
+        while not self._stopping.is_set():
+            wait = self.engine.seconds_until_next()
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+            self.wakeups += 1
+            for timer in self.engine.pop_due():
+                self.fire(timer)
+
+    def fire(self, timer):
+        label = f" ({timer.label})" if timer.label else ""
+        print(f"ALARM! Time's up{label}.")
+        if self.sound:
+            import alarm_audio
+            alarm_audio.default_player().play(self.sound)
+        if self.alert:
+            self._alerts.submit(self.alert, label)
+
+    # --- Commands ---
+
+    def handle(self, line):
+        """Runs one text command and returns a JSON-serialisable reply."""
+        parts = line.split()
+        if not parts:
+            return {"ok": False, "error": "empty command"}
+        command, args = parts[0].lower(), parts[1:]
+
+        if command == "start":
+            try:
+                minutes = float(args[0])
+                timer = self.engine.add(minutes * 60, label=" ".join(args[1:]) or f"{minutes:g} min")
+            except (IndexError, ValueError):
+                return {"ok": False, "error": "usage: start <minutes> [label]"}
+            self._changed.set()
+            return {"ok": True, "timer": self._describe(timer)}
+
+        if command == "stop":
+            if args == ["all"]:
+                self.engine.cancel_all()
+            else:
+                try:
+                    if not self.engine.cancel(int(args[0])):
+                        return {"ok": False, "error": f"no timer {args[0]}"}
+                except (IndexError, ValueError):
+                    return {"ok": False, "error": "usage: stop <id>|all"}
+            self._changed.set()
+            return {"ok": True}
+
+        if command == "list":
+            return {"ok": True, "timers": [self._describe(t) for t in self.engine.active()]}
+
+        if command == "stats":
+            minutes = max((time.monotonic() - self.started) / 60.0, 1e-9)
+            return {
+                "ok": True,
+                "rss_kb": read_rss_kb(),
+                "wakeups": self.wakeups,
+                "wakeups_per_min": self.wakeups / minutes,
+                "timers": len(self.engine),
+                "tk_loaded": "tkinter" in sys.modules,
+            }
+
+        if command == "shutdown":
+            self._stopping.set()
+            self._changed.set()
+            return {"ok": True}
+
+        return {"ok": False, "error": f"unknown command '{command}'"}
+
+    def _describe(self, timer):
+        return {
+            "id": timer.id,
+            "label": timer.label,
+            "remaining": round(self.engine.remaining(timer), 1),
+            "ends": time.strftime("%H:%M:%S", time.localtime(timer.wall_deadline)),
+        }
+
+    async def _client(self, reader, writer):
+        try:
+            line = (await reader.readline()).decode("utf-8", "replace")
+            if not line:
+                return  # connected and hung up (e.g. daemon_running())
+            try:
+                reply = self.handle(line)
+            except Exception as e:
+                # Keep serving; the client gets the error instead of a dropped connection
+                print(f"Error handling {line.strip()!r}: {e!r}")
+                reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            writer.write((json.dumps(reply) + "\n").encode("utf-8"))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path=SOCKET_PATH):
+        self._changed = asyncio.Event()
+        self._stopping = asyncio.Event()
+        if daemon_running(socket_path):
+            raise RuntimeError(f"A timer daemon is already listening on {socket_path}")
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # left behind by a daemon that didn't exit cleanly
+        server = await asyncio.start_unix_server(self._client, path=socket_path)
+        print(f"Timer daemon listening on {socket_path} ({len(self.engine)} timers restored)")
+        try:
+            async with server:
+                await self.run_timers()
+        finally:
+            os.unlink(socket_path)
+            self._alerts.shutdown(wait=False)
+
+
+def daemon_running(socket_path=SOCKET_PATH):
+    """True if something accepts connections on the socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False
+    return True
+
+
+def send_command(line, socket_path=SOCKET_PATH):
+    """Sends one command to a running daemon and returns its reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall((line + "\n").encode("utf-8"))
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            reply += chunk
+    if not reply:
+        return {"ok": False, "error": "the daemon closed the connection without replying"}
+    return json.loads(reply.decode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless py-assist timer daemon.")
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    parser.add_argument("--file", default=DAEMON_TIMERS_FILE, help="where timers are persisted")
+    parser.add_argument("--no-alert", action="store_true", help="don't pop up a window when a timer fires")
+    parser.add_argument("command", nargs="?", default="serve", help="serve, start, stop, list, stats or shutdown")
+    parser.add_argument("args", nargs="*")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        engine = TimerEngine(args.file)
+        engine.load()
+        daemon = TimerDaemon(engine, alert=None if args.no_alert else show_alert)
+        try:
+            asyncio.run(daemon.serve(args.socket))
+        except KeyboardInterrupt:
+            pass
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+
+    try:
+        reply = send_command(" ".join([args.command] + args.args), args.socket)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print("Timer daemon is not running. Start it with: python3 timer_daemon.py serve")
+        sys.exit(1)
+
+    if not reply.get("ok"):
+        print(f"Error: {reply.get('error')}")
+        sys.exit(1)
+    if "timers" in reply and isinstance(reply["timers"], list):
+        if not reply["timers"]:
+            print("No timers running.")
+        for t in reply["timers"]:
+            print(f"[{t['id']}] {t['label']:<20} {t['remaining']:>8.0f}s left (ends {t['ends']})")
+    elif "timer" in reply:
+        t = reply["timer"]
+        print(f"Started timer {t['id']} ({t['label']}), ends {t['ends']}")
+    elif args.command == "stats":
+        for key, value in reply.items():
+            if key != "ok":
+                print(f"{key:>16}: {value:.2f}" if isinstance(value, float) else f"{key:>16}: {value}")
+
+
+if __name__ == "__main__":
+    main()
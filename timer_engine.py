@@ -0,0 +1,217 @@
+"""
+Deadline-based timer engine shared by the timer front ends.
+
+Every timer is stored as an absolute time.monotonic() deadline in a
+min-heap, so remaining time is always computed from the clock instead of
+being counted down tick by tick. The owner only has to wake up once, at
+next_deadline(), no matter how many timers are running.
+
+Timers are persisted as wall-clock deadlines so they survive restarts; a
+timer that expired while nothing was running fires on the next load.
+Every change rewrites the file, so changes made together should go inside
+`with engine.batch():` to be written once.
+"""
+
+import contextlib
+import heapq
+import json
+import math
+import os
+import time
+
+# --- Configuration ---
+TIMERS_FILE = "/home/clawber/projects/py-assist/output/timers.json"
+
+
+class Timer:
+    """A single countdown or alarm."""
+    __slots__ = ("id", "label", "deadline", "wall_deadline", "duration")
+
+    def __init__(self, timer_id, label, deadline, wall_deadline, duration):
+        self.id = timer_id
+        self.label = label
+        self.deadline = deadline            # time.monotonic() based
+        self.wall_deadline = wall_deadline  # time.time() based, for persistence
+        self.duration = duration
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "label": self.label,
+            "wall_deadline": self.wall_deadline,
+            "duration": self.duration,
+        }
+
+
+class TimerEngine:
+    """Keeps any number of timers ordered by deadline."""
+
+    def __init__(self, path=None, clock=time.monotonic, wall_clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self._timers = {}  # id -> Timer
+        self._heap = []    # (deadline, id); cancelled ids are skipped lazily
+        self._next_id = 1
+        self._batch_depth = 0
+        self._unsaved = False
+
+    # --- Timer management ---
+
+    def add(self, seconds, label=""):
+        """Starts a timer that fires `seconds` from now and returns it."""
+        if not math.isfinite(seconds) or seconds <= 0:
+            raise ValueError("Timer duration must be a positive, finite number")
+        now = self.clock()
+        timer = Timer(self._next_id, label, now + seconds, self.wall_clock() + seconds, seconds)
+        self._next_id += 1
+        self._push(timer)
+        self.save()
+        return timer
+
+    def cancel(self, timer_id):
+        """Cancels a timer. Returns False if it wasn't running."""
+        if self._timers.pop(timer_id, None) is None:
+            return False
+        self._maybe_compact()
+        self.save()
+        return True
+
+    def cancel_all(self):
+        self._timers.clear()
+        self._heap.clear()
+        self.save()
+
+    def get(self, timer_id):
+        return self._timers.get(timer_id)
+
+    def active(self):
+        """Returns the running timers, soonest first."""
+        return sorted(self._timers.values(), key=lambda t: t.deadline)
+
+    def __len__(self):
+        return len(self._timers)
+
+    def remaining(self, timer, now=None):
+        """Seconds left on a timer (never negative)."""
+        if now is None:
+            now = self.clock()
+        return max(0.0, timer.deadline - now)
+
+    # --- Scheduling ---
+
+    def peek(self):
+        """Returns the timer that fires next, or None."""
+        heap = self._heap
+        while heap:
+            deadline, timer_id = heap[0]
+            timer = self._timers.get(timer_id)
+            if timer is not None and timer.deadline == deadline:
+                return timer
+            heapq.heappop(heap)  # stale entry for a cancelled timer
+        return None
+
+    def next_deadline(self):
+        """Monotonic deadline of the next timer, or None if nothing is running."""
+        timer = self.peek()
+        return timer.deadline if timer is not None else None
+
+    def seconds_until_next(self, now=None):
+        """Seconds until the next deadline (0 if overdue), or None."""
+        deadline = self.next_deadline()
+        if deadline is None:
+            return None
+        if now is None:
+            now = self.clock()
+        return max(0.0, deadline - now)
+
+    def pop_due(self, now=None):
+        """Removes and returns every timer whose deadline has passed, in order."""
+        if now is None:
+            now = self.clock()
+        due = []
+        while True:
+            timer = self.peek()
+            if timer is None or timer.deadline > now:
+                break
+            heapq.heappop(self._heap)
+            del self._timers[timer.id]
+            due.append(timer)
+        if due:
+            self.save()
+        return due
+
+    def _push(self, timer):
+        self._timers[timer.id] = timer
+        heapq.heappush(self._heap, (timer.deadline, timer.id))
+
+    def _maybe_compact(self):
+        # Cancelled timers leave stale heap entries behind; rebuild once they
+        # outnumber the live ones so the heap doesn't grow without bound.
+        if len(self._heap) > 2 * len(self._timers) + 16:
+            self._heap = [(t.deadline, t.id) for t in self._timers.values()]
+            heapq.heapify(self._heap)
+
+    # --- Persistence ---
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Defers saving until the outermost batch ends, then saves once if anything changed."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._unsaved:
+                self.save()
+
+    def save(self):
+        """Writes the running timers to disk (no-op without a path; deferred inside batch())."""
+        if not self.path:
+            return
+        if self._batch_depth:
+            self._unsaved = True
+            return
+        self._unsaved = False
+        data = {
+            "next_id": self._next_id,
+            "timers": [t.to_dict() for t in self._timers.values()],
+        }
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not save timers to {self.path}: {e}")
+
+    def load(self):
+        """Restores timers saved by a previous run."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Could not load timers from {self.path}: {e}")
+            return
+
+        now, wall_now = self.clock(), self.wall_clock()
+        for item in data.get("timers", []):
+            try:
+                wall_deadline = float(item["wall_deadline"])
+                duration = float(item.get("duration", 0))
+                if not (math.isfinite(wall_deadline) and math.isfinite(duration)):
+                    continue
+                timer = Timer(
+                    int(item["id"]),
+                    item.get("label", ""),
+                    now + (wall_deadline - wall_now),
+                    wall_deadline,
+                    duration,
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+            self._push(timer)
+            self._next_id = max(self._next_id, timer.id + 1)
+        self._next_id = max(self._next_id, int(data.get("next_id", 1)))
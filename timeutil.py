@@ -0,0 +1,59 @@
+"""
+Time handling for logged entries.
+
+Timestamps are integer epoch milliseconds plus the UTC offset (seconds)
+that was in effect where they were written; that is what storage keeps
+and what gets compared and sorted. Zones come from the standard
+library's zoneinfo and are resolved once per name, so pytz is no longer
+needed. format_local() turns a stored pair into "YYYY-MM-DD HH:MM:SS"
+with plain arithmetic for the time of day and a memoized date prefix,
+instead of building a datetime and calling strftime() per entry.
+"""
+
+import functools
+import time
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+_EPOCH_DAY = date(1970, 1, 1).toordinal()
+
+
+@functools.lru_cache(maxsize=None)
+def zone(name):
+    """The tzinfo for an IANA zone name such as 'Asia/Manila', looked up once."""
+    return ZoneInfo(name)
+
+
+def now_ms():
+    return time.time_ns() // 1_000_000
+
+
+def now(tz):
+    """The current time as (epoch_ms, utc_offset_seconds) in the given zone."""
+    epoch_ms = now_ms()
+    return epoch_ms, offset_at(epoch_ms, tz)
+
+
+def offset_at(epoch_ms, tz):
+    """The zone's UTC offset in seconds at that instant (DST-aware)."""
+    local = datetime.fromtimestamp(epoch_ms / 1000, tz)
+    return int(local.utcoffset().total_seconds())
+
+
+@functools.lru_cache(maxsize=4096)
+def _date_prefix(local_day):
+    return date.fromordinal(_EPOCH_DAY + local_day).isoformat()
+
+
+def format_local(epoch_ms, utc_offset):
+    """'YYYY-MM-DD HH:MM:SS' as shown on the clock where the entry was written."""
+    day, seconds = divmod(epoch_ms // 1000 + utc_offset, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{_date_prefix(day)} {hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def iso_format(epoch_ms, utc_offset):
+    """ISO 8601 with the offset, to the second (e.g. '2025-06-28T03:54:02+08:00')."""
+    tz = timezone(timedelta(seconds=utc_offset))
+    return datetime.fromtimestamp(epoch_ms // 1000, tz).isoformat()
@@ -0,0 +1,286 @@
+"""
+Opt-in latency instrumentation for the Tk tools (main.py, timer.py,
+bd-browser-highlighter.py).
+
+Set PY_ASSIST_TK_TRACE before starting a tool to turn it on:
+
+    PY_ASSIST_TK_TRACE=1 python3 main.py            # print a summary on exit
+    PY_ASSIST_TK_TRACE=/tmp/trace.json python3 main.py
+                                                    # summary + Chrome trace file
+
+The trace file can be opened in chrome://tracing or https://ui.perfetto.dev.
+When the variable is unset, install() and watch() do nothing.
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import tkinter as tk
+
+# --- Configuration ---
+ENV_VAR = "PY_ASSIST_TK_TRACE"
+
+# Upper bounds (in milliseconds) of the latency histogram buckets.
+BUCKETS_MS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+# How often the heartbeat checks the event loop, and how late it has to be
+# before we call it a stall.
+HEARTBEAT_MS = 50
+STALL_THRESHOLD_MS = 100
+
+# Keep the trace file from growing without bound in long sessions.
+MAX_TRACE_EVENTS = 200_000
+
+
+class HandlerStats:
+    """Latency histogram for a single handler."""
+    __slots__ = ("name", "count", "total_ms", "max_ms", "buckets")
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def record(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, pct):
+        """Approximate percentile, reported as the upper bound of its bucket."""
+        if not self.count:
+            return 0.0
+        target = self.count * pct / 100.0
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+
+class Recorder:
+    """Collects handler timings, stalls and trace events for one process."""
+
+    def __init__(self, trace_path=None):
+        self.trace_path = trace_path
+        self.stats = {}
+        self.stalls = []
+        self.events = []
+        self.dropped_events = 0
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+
+    def record(self, name, start, end):
+        ms = (end - start) * 1000.0
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = HandlerStats(name)
+        stats.record(ms)
+
+        if self.trace_path:
+            if len(self.events) < MAX_TRACE_EVENTS:
+                self.events.append({
+                    "name": name,
+                    "cat": "tk",
+                    "ph": "X",
+                    "ts": (start - self.origin) * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": self.pid,
+                    "tid": threading.get_ident(),
+                })
+            else:
+                self.dropped_events += 1
+
+    def record_stall(self, start, late_ms):
+        self.stalls.append(late_ms)
+        if self.trace_path and len(self.events) < MAX_TRACE_EVENTS:
+            self.events.append({
+                "name": f"stall {late_ms:.0f}ms",
+                "cat": "stall",
+                "ph": "i",
+                "s": "p",
+                "ts": (start - self.origin) * 1e6,
+                "pid": self.pid,
+                "tid": threading.get_ident(),
+            })
+
+    def summary(self):
+        """Returns a human-readable summary, slowest handlers first."""
+        lines = ["--- Tk handler latency (ms) ---"]
+        lines.append(f"{'handler':<48} {'count':>7} {'mean':>8} {'p50':>7} {'p99':>7} {'max':>8}")
+        ordered = sorted(self.stats.values(), key=lambda s: s.max_ms, reverse=True)
+        for s in ordered:
+            mean = s.total_ms / s.count if s.count else 0.0
+            lines.append(
+                f"{s.name[:48]:<48} {s.count:>7} {mean:>8.2f} "
+                f"{s.percentile(50):>7.0f} {s.percentile(99):>7.0f} {s.max_ms:>8.2f}"
+            )
+        if self.stalls:
+            lines.append(
+                f"Event-loop stalls over {STALL_THRESHOLD_MS}ms: {len(self.stalls)} "
+                f"(worst {max(self.stalls):.0f}ms)"
+            )
+        else:
+            lines.append(f"No event-loop stalls over {STALL_THRESHOLD_MS}ms.")
+        return "\n".join(lines)
+
+    def write_trace(self):
+        """Writes the collected events in Chrome trace-event format."""
+        if not self.trace_path:
+            return
+        with open(self.trace_path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        if self.dropped_events:
+            print(f"tk_instrument: dropped {self.dropped_events} trace events", file=sys.stderr)
+
+    def dump(self):
+        print(self.summary(), file=sys.stderr)
+        try:
+            self.write_trace()
+        except OSError as e:
+            print(f"tk_instrument: could not write trace: {e}", file=sys.stderr)
+
+
+# The active recorder, or None when instrumentation is off.
+_recorder = None
+
+
+def handler_name(func):
+    """Builds a stable, readable name for a callback."""
+    name = getattr(func, "__qualname__", None) or getattr(func, "__name__", None)
+    if name is None:
+        name = type(func).__qualname__
+    return name
+
+
+def wrap(func, label):
+    """Wraps a callback so every call is timed under the given label."""
+    recorder = _recorder
+
+    def timed(*args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            recorder.record(label, start, time.perf_counter())
+
+    timed.__name__ = getattr(func, "__name__", type(func).__name__)
+    timed.__wrapped__ = func
+    return timed
+
+
+def _patch_tkinter():
+    """
+    Routes every bind, after() and protocol callback through wrap(), plus
+    every other callback Tk registers as a command (widget command=,
+    scrollbar, validation and menu commands).
+    """
+    original_bind = tk.Misc._bind
+    original_after = tk.Misc.after
+    original_after_idle = tk.Misc.after_idle
+    original_register = tk.Misc._register
+    original_protocol = tk.Wm.wm_protocol
+    # >0 while one of the wrappers below registers an already wrapped callback
+    labelled = [0]
+
+    def registering(original):
+        def call(*args, **kwargs):
+            labelled[0] += 1
+            try:
+                return original(*args, **kwargs)
+            finally:
+                labelled[0] -= 1
+        return call
+
+    def _bind(self, what, sequence, func, add, needcleanup=1):
+        if callable(func) and sequence:
+            func = wrap(func, f"{sequence} {handler_name(func)}")
+        return registering(original_bind)(self, what, sequence, func, add, needcleanup)
+
+    def after(self, ms, func=None, *args):
+        # after_idle() goes through after() with an already wrapped callback
+        if func is not None and not labelled[0]:
+            func = wrap(func, f"after {handler_name(func)}")
+        return registering(original_after)(self, ms, func, *args)
+
+    def after_idle(self, func, *args):
+        return registering(original_after_idle)(self, wrap(func, f"after_idle {handler_name(func)}"), *args)
+
+    def _register(self, func, subst=None, needcleanup=1):
+        if not labelled[0]:
+            func = wrap(func, f"command {handler_name(func)}")
+        return original_register(self, func, subst, needcleanup)
+
+    def wm_protocol(self, name=None, func=None):
+        if callable(func):
+            func = wrap(func, f"protocol {name} {handler_name(func)}")
+        return registering(original_protocol)(self, name, func)
+
+    tk.Misc._bind = _bind
+    tk.Misc.after = after
+    tk.Misc.after_idle = after_idle
+    tk.Misc._register = tk.Misc.register = _register
+    tk.Wm.wm_protocol = tk.Wm.protocol = wm_protocol
+    tk.Misc._tk_instrument_originals = (original_bind, original_after, original_after_idle)
+
+
+def install(trace_path=None):
+    """
+    Turns instrumentation on for this process.
+
+    Call before any widgets are created. Without arguments the
+    PY_ASSIST_TK_TRACE environment variable decides whether anything happens.
+    Returns the active recorder, or None if instrumentation stays off.
+    """
+    global _recorder
+    if _recorder is not None:
+        return _recorder
+
+    if trace_path is None:
+        setting = os.environ.get(ENV_VAR, "").strip()
+        if not setting or setting == "0":
+            return None
+        if setting != "1":
+            trace_path = setting
+
+    _recorder = Recorder(trace_path)
+    _patch_tkinter()
+    atexit.register(_recorder.dump)
+    return _recorder
+
+
+def watch(root, interval_ms=HEARTBEAT_MS, threshold_ms=STALL_THRESHOLD_MS):
+    """
+    Starts a heartbeat on the given Tk root that reports event-loop stalls.
+
+    Each beat is scheduled interval_ms ahead; when it runs more than
+    threshold_ms late, something kept the loop busy in between.
+    """
+    if _recorder is None:
+        return
+    recorder = _recorder
+    original_after = tk.Misc._tk_instrument_originals[1]
+    expected = [time.perf_counter() + interval_ms / 1000.0]
+
+    def beat():
+        now = time.perf_counter()
+        late_ms = (now - expected[0]) * 1000.0
+        if late_ms > threshold_ms:
+            recorder.record_stall(expected[0], late_ms)
+        expected[0] = now + interval_ms / 1000.0
+        # Use the unwrapped after() so the heartbeat doesn't show up as a handler.
+        original_after(root, interval_ms, beat)
+
+    original_after(root, interval_ms, beat)
@@ -0,0 +1,282 @@
+"""
+In-process X11 window control, replacing the xdotool calls in test.py,
+bd_script.sh and timetracker_script.sh.
+
+WindowController keeps one X connection open, caches window IDs by title
+and drops cache entries when the window manager's client list changes or
+a cached window is renamed or destroyed (PropertyNotify/DestroyNotify).
+toggle() does the whole "minimize if focused, otherwise activate and
+raise" dance with no processes spawned.
+
+Needs python-xlib (pip install python-xlib).
+
+    python3 wmctl.py toggle "Braindump"    # exit 2 if no such window
+    python3 wmctl.py minimize "Timetracker"
+    python3 wmctl.py serve &               # optional: keep the connection
+                                           # and cache alive between hotkeys
+
+When `serve` is running, the other commands are forwarded to it over a
+Unix socket, so repeated hotkey presses reuse its warm cache. The hotkey
+scripts talk to that socket directly with socat or nc, so a press costs
+no Python startup at all. The protocol is one line, "COMMAND TITLE\n",
+and the reply is the exit code followed by "\n". WMCTL_SOCKET overrides
+the socket path.
+"""
+
+import fcntl
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+
+try:
+    from Xlib import X, display as xdisplay, error as xerror
+    from Xlib.protocol import event as xevent
+except ImportError:
+    xdisplay = None
+
+# --- Configuration ---
+SOCKET_PATH = os.environ.get('WMCTL_SOCKET') or os.path.join(
+    tempfile.gettempdir(), f"py-assist-wmctl-{os.getuid()}.sock")
+
+# Exit codes used by the shell scripts
+EXIT_OK = 0
+EXIT_NOT_FOUND = 2
+EXIT_UNAVAILABLE = 3
+
+ICONIC_STATE = 3
+SOURCE_PAGER = 2  # _NET_ACTIVE_WINDOW source indication: user action
+
+
+class WindowController:
+    """One persistent X connection with a title -> window ID cache."""
+
+    def __init__(self, display_name=None):
+        if xdisplay is None:
+            raise RuntimeError("python-xlib is not installed (pip install python-xlib)")
+        self.display = xdisplay.Display(display_name)
+        self.root = self.display.screen().root
+        atom = self.display.intern_atom
+        self.NET_CLIENT_LIST = atom('_NET_CLIENT_LIST')
+        self.NET_ACTIVE_WINDOW = atom('_NET_ACTIVE_WINDOW')
+        self.NET_WM_NAME = atom('_NET_WM_NAME')
+        self.UTF8_STRING = atom('UTF8_STRING')
+        self.WM_NAME = atom('WM_NAME')
+        self.WM_CHANGE_STATE = atom('WM_CHANGE_STATE')
+
+        self._cache = {}       # title -> window id
+        self._watched = set()  # window ids we get events for
+        self.root.change_attributes(event_mask=X.PropertyChangeMask)
+        self.display.flush()
+
+    def close(self):
+        self.display.close()
+
+    # --- Cache maintenance ---
+
+    def _process_events(self):
+        """Applies pending X events to the cache without blocking."""
+        while self.display.pending_events():
+            ev = self.display.next_event()
+            if ev.type == X.PropertyNotify:
+                if ev.window.id == self.root.id:
+                    if ev.atom == self.NET_CLIENT_LIST:
+                        self._cache.clear()
+                elif ev.atom in (self.NET_WM_NAME, self.WM_NAME):
+                    self._forget(ev.window.id)
+            elif ev.type == X.DestroyNotify:
+                self._forget(ev.window.id)
+                self._watched.discard(ev.window.id)
+
+    def _forget(self, wid):
+        for title in [t for t, cached in self._cache.items() if cached == wid]:
+            del self._cache[title]
+
+    def _watch(self, wid):
+        if wid in self._watched:
+            return
+        window = self.display.create_resource_object('window', wid)
+        window.change_attributes(event_mask=X.PropertyChangeMask | X.StructureNotifyMask)
+        self._watched.add(wid)
+
+    # --- Queries ---
+
+    def window_name(self, wid):
+        window = self.display.create_resource_object('window', wid)
+        try:
+            prop = window.get_full_property(self.NET_WM_NAME, self.UTF8_STRING)
+            if prop is not None:
+                value = prop.value
+                return value.decode('utf-8', 'replace') if isinstance(value, bytes) else str(value)
+            name = window.get_wm_name()
+            return name.decode('latin-1') if isinstance(name, bytes) else name
+        except xerror.XError:
+            return None
+
+    def client_windows(self):
+        prop = self.root.get_full_property(self.NET_CLIENT_LIST, X.AnyPropertyType)
+        if prop is not None:
+            return list(prop.value)
+        # No EWMH window manager (e.g. a bare Xvfb): top-level windows are root's children
+        return [child.id for child in self.root.query_tree().children]
+
+    def find(self, title):
+        """Returns the ID of the first window whose title contains `title`, or None."""
+        self._process_events()
+        wid = self._cache.get(title)
+        if wid is not None:
+            return wid
+        for wid in self.client_windows():
+            name = self.window_name(wid)
+            if name and title in name:
+                self._cache[title] = wid
+                self._watch(wid)
+                self.display.flush()
+                return wid
+        return None
+
+    def active_window(self):
+        prop = self.root.get_full_property(self.NET_ACTIVE_WINDOW, X.AnyPropertyType)
+        return prop.value[0] if prop is not None and len(prop.value) else None
+
+    # --- Actions ---
+
+    def _client_message(self, wid, message_type, data):
+        window = self.display.create_resource_object('window', wid)
+        ev = xevent.ClientMessage(window=window, client_type=message_type, data=(32, data + [0] * (5 - len(data))))
+        self.root.send_event(ev, event_mask=X.SubstructureRedirectMask | X.SubstructureNotifyMask)
+
+    def minimize(self, wid):
+        """Iconifies a window the same way XIconifyWindow (and xdotool) do."""
+        self._client_message(wid, self.WM_CHANGE_STATE, [ICONIC_STATE])
+        self.display.flush()
+
+    def activate(self, wid):
+        """Asks the window manager to focus the window, then raises it."""
+        self._client_message(wid, self.NET_ACTIVE_WINDOW, [SOURCE_PAGER, X.CurrentTime, 0])
+        self.display.create_resource_object('window', wid).configure(stack_mode=X.Above)
+        self.display.flush()
+
+    def toggle(self, title, retry=True):
+        """
+        Minimizes the window if it's focused, otherwise activates and raises it.
+        Returns 'minimized', 'activated' or None if there is no such window.
+        """
+        wid = self.find(title)
+        if wid is None:
+            return None
+        try:
+            if wid == self.active_window():
+                self.minimize(wid)
+                self.display.sync()
+                return 'minimized'
+            self.activate(wid)
+            self.display.sync()
+            return 'activated'
+        except xerror.BadWindow:
+            # Closed after it was cached; look it up once more
+            self._forget(wid)
+            return self.toggle(title, retry=False) if retry else None
+
+    def run(self, command, title):
+        """Runs a CLI command; returns an exit code."""
+        if command == 'toggle':
+            return EXIT_OK if self.toggle(title) else EXIT_NOT_FOUND
+        if command == 'minimize':
+            wid = self.find(title)
+            if wid is None:
+                return EXIT_NOT_FOUND
+            self.minimize(wid)
+            return EXIT_OK
+        if command == 'activate':
+            wid = self.find(title)
+            if wid is None:
+                return EXIT_NOT_FOUND
+            self.activate(wid)
+            return EXIT_OK
+        raise ValueError(f"unknown command '{command}'")
+
+
+# --- Optional server, so the connection and cache outlive one hotkey press ---
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline().decode('utf-8', 'replace')
+        if not line:
+            return  # connected and hung up without a command
+        command, _, title = line.rstrip('\n').partition(' ')
+        try:
+            code = self.server.controller.run(command, title)
+        except Exception as e:
+            print(f"wmctl: {command} {title!r} failed: {e}", file=sys.stderr)
+            code = EXIT_UNAVAILABLE
+        self.wfile.write(f"{code}\n".encode('utf-8'))
+
+
+def serve(socket_path=SOCKET_PATH):
+    # Held for as long as the server runs: a second `serve` (two hotkey
+    # presses both finding no server) gives up instead of replacing it
+    lock = open(socket_path + '.lock', 'a')
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        raise RuntimeError(f"a wmctl server is already running on {socket_path}") from None
+    with lock:
+        controller = WindowController()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # left behind by a server that didn't exit cleanly
+        with socketserver.UnixStreamServer(socket_path, _Handler) as server:
+            server.controller = controller
+            try:
+                server.serve_forever()
+            finally:
+                os.unlink(socket_path)
+
+
+def _via_server(command, title, socket_path=SOCKET_PATH):
+    """Forwards a command to a running server; returns None if there isn't one."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            sock.sendall(f"{command} {title}\n".encode('utf-8'))
+            return int(sock.makefile().readline().strip() or EXIT_UNAVAILABLE)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+
+
+def main(argv):
+    if len(argv) == 1 and argv[0] == 'serve':
+        try:
+            serve()
+        except KeyboardInterrupt:
+            pass
+        except Exception as e:
+            print(f"wmctl: {e}", file=sys.stderr)
+            return EXIT_UNAVAILABLE
+        return EXIT_OK
+    if len(argv) != 2:
+        print("Usage: wmctl.py toggle|minimize|activate TITLE  or  wmctl.py serve", file=sys.stderr)
+        return EXIT_UNAVAILABLE
+
+    command, title = argv
+    code = _via_server(command, title)
+    if code is not None:
+        return code
+    try:
+        controller = WindowController()
+    except Exception as e:
+        print(f"wmctl: {e}", file=sys.stderr)
+        return EXIT_UNAVAILABLE
+    try:
+        return controller.run(command, title)
+    except Exception as e:
+        print(f"wmctl: {e}", file=sys.stderr)
+        return EXIT_UNAVAILABLE
+    finally:
+        controller.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))